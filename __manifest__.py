@@ -27,6 +27,7 @@ Key Features:
         'mail',
         'website',
         'portal',
+        'auth_signup',
     ],
     'data': [
         'security/ir.model.access.csv',
@@ -42,6 +43,8 @@ Key Features:
         'views/student_views.xml',
         'views/subject_views.xml',
         'views/report_views.xml',
+        'views/transcript_export_views.xml',
+        'views/grade_statistics_views.xml',
         'views/website_templates.xml',
         'views/portal_templates.xml',
         'views/university_views.xml',
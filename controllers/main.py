@@ -1,43 +1,170 @@
+import hashlib
+from datetime import timezone
+
 from odoo import http
 from odoo.http import request
+from odoo.tools import lazy
+
+# Professors per directory page
+_PROFESSOR_PAGE_SIZE = 24
+# Stable keyset ordering of the directory; the cursor is the (name, id) of a boundary professor
+_PROFESSOR_ORDER = 'name, id'
+# Results per model on the /universidad search page
+_SEARCH_LIMIT = 24
 
 
 class UniversityWebsite(http.Controller):
     """Handles external website routing for university assets."""
 
     @http.route(['/universidad'], type='http', auth='public', website=True)
-    def list_universities(self, **kw):
+    def list_universities(self, search=None, **kw):
         """
-        Renders the public catalog of all universities.
+        Renders the public catalog of all universities, or the ranked matches of a search.
         sudo(): public route — no authenticated user.
+
+        Args:
+            search (str | None): Substring searched in university and professor names.
         """
-        universities = request.env['university.university'].sudo().search([], limit=100)
-        return request.render('university.website_uni_list', {
-            'universities': universities
-        })
+        University = request.env['university.university'].sudo()
+        search = (search or '').strip()[:100]
+        if search:
+            return self._render_search_results(search)
+
+        stamp = University._get_website_stamp()
+        return self._render_cached_page('university.website_uni_list', {
+            # lazy: never queried when the page fragment is served from the QWeb cache
+            # bin_size: the template only tests image presence; images are served by /web/image
+            'universities': lazy(lambda: University.with_context(bin_size=True).search([], limit=100)),
+        }, stamp)
 
     @http.route(['/universidad/<int:uni_id>'], type='http', auth='public', website=True)
-    def list_professors(self, uni_id, **kw):
+    def list_professors(self, uni_id, after=None, before=None, **kw):
         """
-        Renders the professor directory for a given university.
+        Renders the professor directory for a given university, one keyset page at a time.
         Internal users see all professors; public/portal users see only published ones.
 
         Args:
             uni_id (int): Database ID of the university.
+            after (str | None): ID of the last professor of the previous page (next page).
+            before (str | None): ID of the first professor of the following page (previous page).
         """
-        
-        uni = request.env['university.university'].sudo().browse(uni_id)
-        if not uni.exists():
+        University = request.env['university.university'].sudo()
+        stamp = University._get_website_stamp(uni_id)
+        if not stamp:
             return request.not_found()
-            
-        professors = request.env['university.professor'].sudo().search([
-            ('university_id', '=', uni.id)
-        ], limit=100)
-        # Prefetch image and department in batch to avoid N+1 during template rendering
-        professors.mapped('image_128')
-        professors.mapped('department_id')
 
-        return request.render('university.website_prof_list', {
-            'university': uni,
-            'professors': professors
+        published_only = not request.env.user._is_internal()
+        after_id = int(after) if after and after.isdigit() else None
+        before_id = int(before) if before and before.isdigit() else None
+        return self._render_cached_page('university.website_prof_list', {
+            'university': University.browse(uni_id),
+            'page': lazy(lambda: self._get_professor_page(uni_id, published_only, after_id, before_id)),
+        }, stamp, variant=f'{published_only}-{after_id}-{before_id}')
+
+    def _render_search_results(self, search: str):
+        """
+        Renders the universities and professors matching ``search``, best matches first.
+        Results vary with the term, so they bypass the page cache; the trigram indexes
+        keep the lookups cheap instead.
+        """
+        # sudo(): public route — visibility is enforced by the is_published filter
+        # bin_size: image presence is tested without loading the payloads, served by /web/image
+        University = request.env['university.university'].sudo().with_context(bin_size=True)
+        Professor = request.env['university.professor'].sudo()
+        if request.env.user._is_internal():
+            professor_domain, professor_fnames = [], None
+        else:
+            # Visitors only match names: matching emails would let them probe addresses
+            professor_domain, professor_fnames = [('is_published', '=', True)], ('name',)
+        return request.render('university.website_uni_list', {
+            'search': search,
+            'universities': University._search_ranked(search, limit=_SEARCH_LIMIT),
+            'professors': Professor._search_ranked(
+                search, professor_domain, limit=_SEARCH_LIMIT, fnames=professor_fnames,
+            ),
         })
+
+    def _get_professor_page(self, uni_id: int, published_only: bool, after_id: int | None,
+                            before_id: int | None) -> dict:
+        """
+        Seeks one directory page on (name, id) instead of offsetting, so page N costs
+        the same as page 1; published-only pages are served by a partial index.
+
+        Returns:
+            dict: ``professors`` of the page, ``next_cursor`` and ``prev_cursor`` (IDs or False).
+        """
+        # sudo(): public route — visibility is enforced by the is_published filter
+        # bin_size: image presence is tested without loading the payloads, served by /web/image
+        Professor = request.env['university.professor'].sudo().with_context(bin_size=True)
+        domain = [('university_id', '=', uni_id)]
+        if published_only:
+            domain.append(('is_published', '=', True))
+
+        backwards = bool(before_id) and not after_id
+        boundary = Professor.browse(after_id or before_id).exists() if (after_id or before_id) else Professor
+        if boundary and boundary.university_id.id == uni_id:
+            operator = '<' if backwards else '>'
+            domain += ['|', ('name', operator, boundary.name),
+                       '&', ('name', '=', boundary.name), ('id', operator, boundary.id)]
+        else:
+            backwards = False
+            boundary = Professor
+
+        order = 'name desc, id desc' if backwards else _PROFESSOR_ORDER
+        professors = Professor.search(domain, order=order, limit=_PROFESSOR_PAGE_SIZE + 1)
+        has_more = len(professors) > _PROFESSOR_PAGE_SIZE
+        professors = professors[:_PROFESSOR_PAGE_SIZE]
+        if backwards:
+            professors = professors[::-1]
+        # Prefetch departments in batch to avoid N+1 during template rendering
+        professors.mapped('department_id')
+
+        if backwards:
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, bool(boundary)
+        return {
+            'professors': professors,
+            'next_cursor': professors[-1].id if has_next and professors else False,
+            'prev_cursor': professors[0].id if has_prev and professors else False,
+        }
+
+    def _render_cached_page(self, template: str, values: dict, stamp: tuple, variant: str = ''):
+        """
+        Renders a public page whose content fragment is cached by QWeb (``t-cache`` on
+        ``page_version``; QWeb adds the language and website to the key) and, for anonymous
+        visitors, validated with ETag/Last-Modified: a matching conditional request gets an
+        empty 304 without touching the database beyond the cached stamp.
+
+        Args:
+            template (str): XML ID of the page template.
+            values (dict): Rendering values; expensive ones should be lazy.
+            stamp (tuple): (version hash, last modification) from ``_get_website_stamp``.
+            variant (str): What else distinguishes this rendering (page cursor, visibility).
+        """
+        version, last_modified = stamp
+        version = f'{version}-{variant}'
+        if not request.env.user._is_public():
+            return request.render(template, {**values, 'page_version': version})
+
+        etag = hashlib.sha1(f'{version}-{request.lang.code}-{request.website.id}'.encode()).hexdigest()
+        last_modified = last_modified and last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        httprequest = request.httprequest
+        if httprequest.if_none_match:
+            not_modified = httprequest.if_none_match.contains(etag)
+        else:
+            not_modified = bool(
+                last_modified and httprequest.if_modified_since
+                and last_modified <= httprequest.if_modified_since
+            )
+
+        if not_modified:
+            response = request.make_response('', status=304)
+        else:
+            response = request.render(template, {**values, 'page_version': version})
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        # Shared caches may keep the page but must revalidate it on every request
+        response.headers['Cache-Control'] = 'public, no-cache'
+        return response
@@ -1,56 +1,189 @@
+from datetime import date
+from urllib.parse import urlencode
+
 from odoo import http, _
 from odoo.http import request
-from odoo.addons.portal.controllers.portal import CustomerPortal, pager as portal_pager
+from odoo.addons.portal.controllers.portal import CustomerPortal
+
+# Month in which an academic year starts (the /my/grades year filter)
+_ACADEMIC_YEAR_START_MONTH = 9
 
 
 class UniversityPortal(CustomerPortal):
     """Extends the customer portal to expose student grades under /my/grades."""
 
+    def _get_portal_student(self):
+        """Returns the student profile of the current user (one lookup on the indexed user_id)."""
+        return request.env['university.student'].search([('user_id', '=', request.env.user.id)], limit=1)
+
     def _prepare_home_portal_values(self, counters):
         """Injects is_student and grade_count into the portal homepage context."""
         values = super()._prepare_home_portal_values(counters)
-        student = request.env['university.student'].search(
-            [('user_id', '=', request.env.user.id)], limit=1
-        )
+        student = self._get_portal_student()
         values['is_student'] = bool(student)
         if 'grade_count' in counters:
-            values['grade_count'] = (
-                request.env['university.grade'].search_count([('student_id', '=', student.id)])
-                if student else 0
-            )
+            # Stored counter, kept up to date by database triggers on grade insert/delete
+            values['grade_count'] = student.grade_count if student else 0
         return values
 
+    def _get_grade_sortings(self) -> dict:
+        """Portal orderings of the grades, all served by the (student_id, date, id) index."""
+        return {
+            'date': {'label': _('Newest'), 'order': 'date desc, id desc', 'descending': True},
+            'date_asc': {'label': _('Oldest'), 'order': 'date asc, id asc', 'descending': False},
+        }
+
+    def _get_academic_year_filters(self, student) -> dict:
+        """
+        Builds one filter per academic year spanned by the student's grades, from the
+        date bounds read off the (student_id, date, id) index.
+        """
+        filters = {'all': {'label': _('All Years'), 'domain': []}}
+        date_min, date_max = request.env['university.grade']._read_group(
+            [('student_id', '=', student.id)], aggregates=['date:min', 'date:max'],
+        )[0]
+        if not date_min:
+            return filters
+        for year in range(_academic_year(date_max), _academic_year(date_min) - 1, -1):
+            filters[str(year)] = {
+                'label': f'{year}-{year + 1}',
+                'domain': [
+                    ('date', '>=', date(year, _ACADEMIC_YEAR_START_MONTH, 1)),
+                    ('date', '<', date(year + 1, _ACADEMIC_YEAR_START_MONTH, 1)),
+                ],
+            }
+        return filters
+
     @http.route(['/my/grades', '/my/grades/page/<int:page>'], type='http', auth="user", website=True)
-    def portal_my_grades(self, page=1, sortby='date', **kw):
-        student = request.env['university.student'].search(
-            [('user_id', '=', request.env.user.id)], limit=1
-        )
+    def portal_my_grades(self, page=1, sortby='date', filterby='all', subject=None, after=None, before=None, **kw):
+        """
+        Lists the student's grades one keyset page at a time: pages seek past the
+        boundary grade of the previous one instead of offsetting, so every page costs
+        the same. ``page`` is only accepted for old links and ignored.
+
+        Args:
+            sortby (str): Key of ``_get_grade_sortings``.
+            filterby (str): Starting year of the academic year to show, or 'all'.
+            subject (str | None): ID of the subject to restrict the grades to.
+            after (str | None): Cursor of the last grade of the previous page (next page).
+            before (str | None): Cursor of the first grade of the following page (previous page).
+        """
+        student = self._get_portal_student()
         if not student:
             return request.redirect('/my')
 
         values = self._prepare_portal_layout_values()
 
-        grade_obj = request.env['university.grade']
-        domain = [('student_id', '=', student.id)]
+        searchbar_sortings = self._get_grade_sortings()
+        sortby = sortby if sortby in searchbar_sortings else 'date'
+        searchbar_filters = self._get_academic_year_filters(student)
+        filterby = filterby if filterby in searchbar_filters else 'all'
+        subjects = student.enrollment_ids.subject_id.sorted('name')
+        subject_id = int(subject) if subject and subject.isdigit() else None
+        subject = subjects.filtered(lambda s: s.id == subject_id)
 
-        searchbar_sortings = {
-            'date': {'label': _('Date'), 'order': 'date desc'},
-        }
-        order = searchbar_sortings.get(sortby, searchbar_sortings['date'])['order']
-
-        grade_count = grade_obj.search_count(domain)
-        pager = portal_pager(url="/my/grades", total=grade_count, page=page, step=self._items_per_page)
-        grades = grade_obj.search(domain, order=order, limit=self._items_per_page, offset=pager['offset'])
+        domain = [('student_id', '=', student.id)] + searchbar_filters[filterby]['domain']
+        if subject:
+            domain.append(('enrollment_id.subject_id', '=', subject.id))
+        # Cursors only hold for the listing they were issued for: the searchbar keeps the
+        # query string when the sorting or the year changes, which must start over
+        listing = f'{sortby}.{filterby}.{subject.id or 0}'
+        after_id = _parse_cursor(after, listing)
+        before_id = _parse_cursor(before, listing)
+        grades, next_cursor, prev_cursor = _seek_grades_page(
+            request.env['university.grade'], domain, searchbar_sortings[sortby]['descending'],
+            after_id, before_id, self._items_per_page,
+        )
         # Prefetch relational chains accessed by the template to avoid N+1 per row
         grades.mapped('enrollment_id.subject_id')
         grades.mapped('enrollment_id.professor_id')
 
+        url_args = {'sortby': sortby, 'filterby': filterby}
         values.update({
             'grades': grades,
+            # The stored counter only holds for the unfiltered list: filtered lists are not counted
+            'grade_count': student.grade_count if filterby == 'all' and not subject else None,
+            'next_url': next_cursor and _grades_url(**url_args, subject=subject.id, after=f'{listing}-{next_cursor}'),
+            'prev_url': prev_cursor and _grades_url(**url_args, subject=subject.id, before=f'{listing}-{prev_cursor}'),
+            'subjects': subjects,
+            'subject': subject,
+            'subject_urls': {record.id: _grades_url(**url_args, subject=record.id) for record in subjects},
+            'all_subjects_url': _grades_url(**url_args),
             'page_name': 'grade',
-            'pager': pager,
             'default_url': '/my/grades',
             'searchbar_sortings': searchbar_sortings,
             'sortby': sortby,
+            'searchbar_filters': searchbar_filters,
+            'filterby': filterby,
         })
-        return request.render("university.portal_my_grades", values)
\ No newline at end of file
+        return request.render("university.portal_my_grades", values)
+
+
+def _academic_year(day: date) -> int:
+    """Starting year of the academic year a date falls in."""
+    return day.year if day.month >= _ACADEMIC_YEAR_START_MONTH else day.year - 1
+
+
+def _seek_grades_page(Grade, domain: list, descending: bool, after_id: int | None,
+                      before_id: int | None, limit: int) -> tuple:
+    """
+    Seeks one page of grades past a boundary grade on (date, id), reading the
+    (student_id, date, id) index forwards or backwards. A boundary outside ``domain``
+    (stale or forged cursor) starts over from the first page.
+
+    Returns:
+        tuple: (grades of the page, next cursor, previous cursor); cursors are grade IDs or False.
+    """
+    backwards = bool(before_id) and not after_id
+    boundary = Grade.browse(after_id or before_id).exists() if (after_id or before_id) else Grade
+    if boundary and boundary.filtered_domain(domain):
+        # Walking back to the previous page is walking forward in the reverse ordering
+        descending = descending != backwards
+        domain = domain + _seek_domain(boundary.date, boundary.id, descending)
+    else:
+        backwards = False
+        boundary = Grade
+
+    direction = 'desc' if descending else 'asc'
+    grades = Grade.search(domain, order=f'date {direction}, id {direction}', limit=limit + 1)
+    has_more = len(grades) > limit
+    grades = grades[:limit]
+    if backwards:
+        grades = grades[::-1]
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(boundary)
+    return (
+        grades,
+        grades[-1].id if has_next and grades else False,
+        grades[0].id if has_prev and grades else False,
+    )
+
+
+def _parse_cursor(cursor: str | None, listing: str) -> int | None:
+    """
+    Reads a ``<listing>-<grade id>`` page cursor, the listing being the sorting, year and
+    subject it was issued for. Cursors of another listing are dropped.
+    """
+    cursor_listing, _sep, record_id = (cursor or '').rpartition('-')
+    return int(record_id) if cursor_listing == listing and record_id.isdigit() else None
+
+
+def _seek_domain(value: date | bool, record_id: int, descending: bool) -> list:
+    """
+    Domain of the grades strictly after a boundary grade in the ``date, id`` ordering.
+    PostgreSQL puts undated grades first when descending and last when ascending.
+    """
+    if descending:
+        if not value:
+            return ['|', ('date', '!=', False), '&', ('date', '=', False), ('id', '<', record_id)]
+        return ['|', ('date', '<', value), '&', ('date', '=', value), ('id', '<', record_id)]
+    if not value:
+        return [('date', '=', False), ('id', '>', record_id)]
+    return ['|', '|', ('date', '>', value), ('date', '=', False), '&', ('date', '=', value), ('id', '>', record_id)]
+
+
+def _grades_url(**params) -> str:
+    """URL of a /my/grades page, keeping only the parameters that are set."""
+    query = urlencode({key: value for key, value in params.items() if value})
+    return f'/my/grades?{query}'
@@ -0,0 +1,34 @@
+import os
+
+from odoo import http
+from odoo.http import request
+
+
+class TranscriptExportController(http.Controller):
+    """Serves the ZIP files produced by background transcript exports."""
+
+    @http.route(['/university/transcripts/<int:export_id>/download'], type='http', auth='user')
+    def download_transcripts(self, export_id, **kw):
+        """
+        Streams a finished export from disk; the file is never loaded in memory.
+        Access rights on the export record apply.
+
+        Args:
+            export_id (int): Database ID of the university.transcript.export record.
+        """
+        export = request.env['university.transcript.export'].search([('id', '=', export_id)])
+        if not export or export.state != 'done':
+            return request.not_found()
+        path = export._get_file_path()
+        if not os.path.exists(path):
+            return request.not_found()
+
+        stat = os.stat(path)
+        return http.Stream(
+            type='path',
+            path=path,
+            mimetype='application/zip',
+            download_name=f'{export.name}.zip',
+            size=stat.st_size,
+            last_modified=stat.st_mtime,
+        ).get_response(as_attachment=True)
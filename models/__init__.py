@@ -2,5 +2,8 @@ from . import base_mixins
 from . import university
 from . import academic_entities
 from . import academic_operations
+from . import enrollment_import
 from . import report
 from . import student_pdf
+from . import transcript_export
+from . import grade_statistics
@@ -1,18 +1,58 @@
+import base64
 import logging
+import time
 from collections import defaultdict
+from datetime import timedelta
 from typing import Any
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL, split_every
+from odoo.tools.sql import create_index
 
 _logger = logging.getLogger(__name__)
 
+# Pending report cron: time budget per run (seconds) and chunk sizing. The budget must
+# stay below the server's cron time limit (limit_time_real_cron, 120s by default).
+_REPORT_BUDGET_PARAM = 'university.report_cron_time_budget'
+_REPORT_DEFAULT_BUDGET = 90
+_REPORT_CHUNK_TARGET = 15.0  # seconds of work committed at once
+_REPORT_CHUNK_MIN = 10
+_REPORT_CHUNK_MAX = 500
+# Students whose PDFs are rendered by one wkhtmltopdf run (bounds the PDFs held in memory)
+_REPORT_RENDER_BATCH = 50
+# Lease protecting claimed students; outlives any cron run so only crashed workers lose it
+_REPORT_CLAIM_LEASE = timedelta(minutes=10)
+# Failing reports: attempts before dead-lettering, and exponential backoff between them
+_REPORT_MAX_ATTEMPTS_PARAM = 'university.report_max_attempts'
+_REPORT_DEFAULT_MAX_ATTEMPTS = 5
+_REPORT_RETRY_DELAY = timedelta(minutes=5)
+_REPORT_RETRY_MAX_DELAY = timedelta(days=1)
+# Rendered report PDF cache: eviction limits
+_REPORT_CACHE_MAX_AGE_PARAM = 'university.report_pdf_cache_max_age_days'
+_REPORT_CACHE_DEFAULT_MAX_AGE = 30
+_REPORT_CACHE_MAX_SIZE_PARAM = 'university.report_pdf_cache_max_mb'
+_REPORT_CACHE_DEFAULT_MAX_SIZE = 1024
+_REPORT_CACHE_CLEAR = {
+    'report_pdf_cache': False,
+    'report_pdf_fingerprint': False,
+    'report_pdf_cached_at': False,
+}
+# Portal user provisioning: 'immediate' (in the creating transaction) or 'deferred' (cron)
+_PORTAL_PROVISIONING_PARAM = 'university.portal_provisioning'
+_PORTAL_CHUNK_SIZE = 200
+_PORTAL_TIME_BUDGET = 90
+
+
 # Department
 class Department(models.Model):
     """Management of university departments."""
     _name = 'university.department'
-    _inherit = ['batch.count.mixin']
+    _inherit = ['batch.count.mixin', 'university.website.cache.mixin', 'university.batch.constraint.mixin']
     _description = 'Department'
+    _batch_counters = {
+        'professor_count': ('university.professor', 'department_id'),
+    }
 
     name = fields.Char(string='Name', required=True, index=True, help="Name of the department.")
     university_id = fields.Many2one('university.university', string='University', required=True, index=True)
@@ -25,11 +65,11 @@ class Department(models.Model):
     professor_ids = fields.One2many('university.professor', 'department_id', string='Professors')
 
 
-    professor_count = fields.Integer(compute='_compute_counts', string='Professor Count')
+    professor_count = fields.Integer(compute='_compute_counts', store=True, string='Professor Count')
 
-    @api.depends('professor_ids')
+    @api.depends()
     def _compute_counts(self) -> None:
-        """Calculates the total number of professors recursively in bulk."""
+        """Calculates the total number of professors in bulk (stored, trigger-maintained)."""
         counts = self._get_batch_counts('university.professor', 'department_id')
         for record in self:
             record.professor_count = counts.get(record.id, 0)
@@ -42,23 +82,44 @@ class Department(models.Model):
         Raises:
             ValidationError: If the manager is not a professor of this department.
         """
-        for record in self:
-            if record.manager_id and record.manager_id.department_id != record:
-                raise ValidationError(_(
-                    "The manager '%(manager)s' must belong to this department. "
-                    "Only professors assigned to this department can be selected as manager.",
-                    manager=record.manager_id.name,
-                ))
+        violators = self._get_constraint_violators(SQL(
+            """
+            SELECT d.id
+              FROM %(department)s d
+              JOIN %(professor)s p ON p.id = d.manager_id
+             WHERE d.id = ANY(%(ids)s) AND p.department_id IS DISTINCT FROM d.id
+            """,
+            department=SQL.identifier(self._table),
+            professor=SQL.identifier(self.env['university.professor']._table),
+            ids=self.ids,
+        ), ('university.professor',))
+        violators._raise_constraint_violations(
+            _("Only professors assigned to a department can be selected as its manager:"),
+            lambda record: _(
+                "The manager '%(manager)s' must belong to the department '%(department)s'.",
+                manager=record.manager_id.name,
+                department=record.name,
+            ),
+        )
 
 # Professor
 class UniversityProfessor(models.Model):
     """Management of university professors."""
     _name = 'university.professor'
-    _inherit = ['image.mixin', 'batch.count.mixin', 'website.published.mixin', 'website.seo.metadata']
+    _inherit = [
+        'image.mixin', 'batch.count.mixin', 'website.published.mixin', 'website.seo.metadata',
+        'university.website.cache.mixin', 'university.ranked.search.mixin',
+    ]
     _description = 'University Professor'
+    _batch_counters = {
+        'enrollment_count': ('university.enrollment', 'professor_id'),
+    }
+    _rec_names_search = ['name', 'email']
+    _ranked_search_fields = ('name', 'email')
 
-    name = fields.Char(string='Name', required=True, index=True)
-    email = fields.Char(string='Email', index=True)
+    # Trigram indexes: the ilike searches of the search views and the website match substrings
+    name = fields.Char(string='Name', required=True, index='trigram')
+    email = fields.Char(string='Email', index='trigram')
     
     university_id = fields.Many2one('university.university', string='University', required=True, index=True)
     department_id = fields.Many2one(
@@ -77,25 +138,53 @@ class UniversityProfessor(models.Model):
 
     enrollment_ids = fields.One2many('university.enrollment', 'professor_id', string='Enrollments')
 
-    enrollment_count = fields.Integer(compute='_compute_counts', string='Enrollment Count')
+    enrollment_count = fields.Integer(compute='_compute_counts', store=True, string='Enrollment Count')
+
+    def init(self) -> None:
+        """Creates the partial index serving the public, published-only directory pages."""
+        super().init()
+        create_index(
+            self.env.cr, 'university_professor_published_directory_index', self._table,
+            ['university_id', 'name', 'id'], where='is_published',
+        )
 
-    @api.depends('enrollment_ids')
+    @api.depends()
     def _compute_counts(self) -> None:
-        """Calculates associated enrollments mapped by professor."""
+        """Calculates associated enrollments mapped by professor (stored, trigger-maintained)."""
         counts = self._get_batch_counts('university.enrollment', 'professor_id')
         for record in self:
             record.enrollment_count = counts.get(record.id, 0)
 
+    def write(self, vals):
+        """Moves the professor's academic report rows and grade statistics along with them."""
+        res = super().write(vals)
+        if 'department_id' in vals:
+            self.env['university.report']._refresh_rows('professor_id', self.ids)
+        if 'university_id' in vals:
+            self.env['university.grade.statistics']._mark_stale()
+        return res
+
 
 # Student
 class UniversityStudent(models.Model):
     """Main model for student academic management."""
     _name = 'university.student'
-    _inherit = ['mail.thread', 'mail.activity.mixin', 'batch.count.mixin', 'image.mixin']
+    _inherit = [
+        'mail.thread', 'mail.activity.mixin', 'batch.count.mixin', 'image.mixin',
+        'university.ranked.search.mixin', 'university.batch.constraint.mixin',
+        'university.chunk.commit.mixin',
+    ]
     _description = 'University Student'
+    _batch_counters = {
+        'enrollment_count': ('university.enrollment', 'student_id'),
+        'grade_count': ('university.grade', 'student_id'),
+    }
+    _rec_names_search = ['name', 'email']
+    _ranked_search_fields = ('name', 'email')
 
-    name = fields.Char(string='Name', required=True, index=True)
-    email = fields.Char(string='Email', required=True, index=True)
+    # Trigram indexes for substring search; exact email lookups use the UNIQUE(email) index
+    name = fields.Char(string='Name', required=True, index='trigram')
+    email = fields.Char(string='Email', required=True, index='trigram')
     
     university_id = fields.Many2one('university.university', string='University', required=True, index=True)
     tutor_id = fields.Many2one(
@@ -109,6 +198,20 @@ class UniversityStudent(models.Model):
     enrollment_ids = fields.One2many('university.enrollment', 'student_id', string='Enrollments')
     grade_ids = fields.One2many('university.grade', 'student_id', string='Grades')
     user_id = fields.Many2one('res.users', string='User', copy=False, index=True, ondelete='set null', readonly=True, help="Linked portal user.")
+    portal_state = fields.Selection(
+        selection=[
+            ('none', 'No Account'),
+            ('pending', 'Pending'),
+            ('done', 'Provisioned'),
+            ('failed', 'Failed'),
+        ],
+        string='Portal Account',
+        default='none',
+        copy=False,
+        readonly=True,
+        help="Pending accounts are created in batches by the portal provisioning cron.",
+    )
+    portal_error = fields.Text(string='Portal Provisioning Error', copy=False, readonly=True)
 
     street = fields.Char()
     city = fields.Char()
@@ -117,15 +220,72 @@ class UniversityStudent(models.Model):
     country_id = fields.Many2one('res.country')
     
     report_pending = fields.Boolean(string="Report Pending", default=False, index=True)
+    report_claimed_until = fields.Datetime(
+        string="Report Claimed Until",
+        copy=False,
+        readonly=True,
+        help="Lease of the worker currently generating the pending report.",
+    )
+    report_attempt_count = fields.Integer(string="Report Attempts", copy=False, readonly=True)
+    report_next_attempt = fields.Datetime(
+        string="Next Report Attempt",
+        copy=False,
+        readonly=True,
+        help="The pending report is not retried before this time after a failure.",
+    )
+    report_failed = fields.Boolean(
+        string="Report Failed",
+        copy=False,
+        readonly=True,
+        help="The report failed too many times and is no longer retried automatically.",
+    )
+    report_error = fields.Text(string="Last Report Error", copy=False, readonly=True)
+    report_sent_fingerprint = fields.Char(
+        string="Last Reported Fingerprint",
+        copy=False,
+        readonly=True,
+        help="Fingerprint of the academic record as of the last report sent to the student.",
+    )
+    report_dirty = fields.Boolean(
+        string="Academic Record Changed",
+        copy=False,
+        readonly=True,
+        help="A grade or enrollment changed since the last report; checked by 'Report Changed Students'.",
+    )
+    report_requested_by = fields.Many2one(
+        'res.users',
+        string="Report Requested By",
+        copy=False,
+        readonly=True,
+        help="User notified when this queued quick report is delivered or fails.",
+    )
 
-    enrollment_count = fields.Integer(compute='_compute_counts')
-    grade_count = fields.Integer(compute='_compute_counts')
+    # Last rendered academic report, reused while its fingerprint still matches the data
+    report_pdf_cache = fields.Binary(attachment=True, copy=False, readonly=True, groups='base.group_system')
+    report_pdf_fingerprint = fields.Char(copy=False, readonly=True, groups='base.group_system')
+    report_pdf_cached_at = fields.Datetime(copy=False, readonly=True, groups='base.group_system')
+
+    enrollment_count = fields.Integer(compute='_compute_counts', store=True)
+    grade_count = fields.Integer(compute='_compute_counts', store=True)
 
     _sql_constraints = [
         # Database-level uniqueness: faster, atomic, race-condition-proof vs. Python constraint alone
         ('unique_email', 'UNIQUE(email)', 'A student with this email already exists.'),
     ]
 
+    def init(self) -> None:
+        """Creates the partial index serving the pending report claim query."""
+        super().init()
+        create_index(
+            self.env.cr, 'university_student_report_due_index', self._table,
+            ['report_next_attempt', 'id'], where='report_pending AND report_failed IS NOT TRUE',
+        )
+        create_index(self.env.cr, 'university_student_report_dirty_index', self._table, ['id'], where='report_dirty')
+        create_index(
+            self.env.cr, 'university_student_portal_pending_index', self._table, ['id'],
+            where="portal_state = 'pending'",
+        )
+
     @api.constrains('email')
     def _check_email_unique_login(self) -> None:
         """
@@ -164,17 +324,27 @@ class UniversityStudent(models.Model):
         Raises:
             ValidationError: If the tutor belongs to a different university.
         """
-        for record in self:
-            if (
-                record.tutor_id
-                and record.tutor_id.university_id != record.university_id
-            ):
-                raise ValidationError(_("The tutor must belong to the same university as the student."))
+        violators = self._get_constraint_violators(SQL(
+            """
+            SELECT s.id
+              FROM %(student)s s
+              JOIN %(professor)s p ON p.id = s.tutor_id
+             WHERE s.id = ANY(%(ids)s) AND p.university_id IS DISTINCT FROM s.university_id
+            """,
+            student=SQL.identifier(self._table),
+            professor=SQL.identifier(self.env['university.professor']._table),
+            ids=self.ids,
+        ), ('university.professor',))
+        violators._raise_constraint_violations(
+            _("The tutor must belong to the same university as the student."),
+        )
 
     @api.model_create_multi
     def create(self, vals_list):
         """
         Intersects student creation to auto-provision and link portal users based on email.
+        Existing users are always linked at once; missing ones are created in the same
+        transaction, or queued for the provisioning cron in deferred mode.
 
         Args:
             vals_list (list): Dictionaries of student fields.
@@ -182,42 +352,214 @@ class UniversityStudent(models.Model):
         Returns:
             Recordset: Newly created university.student records.
         """
-        portal_group = self.env.ref('base.group_portal', raise_if_not_found=False)
-        if not portal_group:
-            raise UserError(_("Critical Error: 'base.group_portal' is missing. The system cannot provision portal users."))
-            
-        portal_group_id = portal_group.id
-
         emails = [vals.get('email') for vals in vals_list if vals.get('email') and not vals.get('user_id')]
-        
+        deferred = self._is_portal_provisioning_deferred()
+
         if emails:
-            unique_emails = set(emails)
-            # sudo(): provisioning portal users requires elevated access beyond student creator's rights
-            existing_users = self.env['res.users'].sudo().search([('login', 'in', list(unique_emails))])
-            user_map = {u.login: u.id for u in existing_users}
-
-            emails_to_create = unique_emails - set(user_map.keys())
-
-            if emails_to_create:
-                user_vals = [{
-                    'name': email,
-                    'login': email,
-                    'email': email,
-                    'password': 'odoo',
-                    # group_ids: Many2many on res.users — set portal group as the only group (Odoo 19: groups_id → group_ids)
-                    'group_ids': [(6, 0, [portal_group_id])],
-                } for email in emails_to_create]
-
-                # sudo(): creating res.users requires admin-level privileges
-                new_users = self.env['res.users'].sudo().create(user_vals)
-                user_map.update({u.login: u.id for u in new_users})
-            
+            user_map, invitation_errors = self._get_portal_user_map(emails, create_missing=not deferred)
             for vals in vals_list:
                 email = vals.get('email')
                 if email and not vals.get('user_id') and email in user_map:
                     vals['user_id'] = user_map[email]
+                    if email in invitation_errors:
+                        vals['portal_error'] = invitation_errors[email]
 
-        return super().create(vals_list)
+        for vals in vals_list:
+            if vals.get('user_id'):
+                vals['portal_state'] = 'done'
+            elif vals.get('email') and deferred:
+                vals['portal_state'] = 'pending'
+
+        students = super().create(vals_list)
+        if any(vals.get('portal_state') == 'pending' for vals in vals_list):
+            # sudo(): scheduling a cron trigger is restricted to administrators
+            self.env.ref('university.ir_cron_provision_portal_users').sudo()._trigger()
+        return students
+
+    @api.model
+    def _is_portal_provisioning_deferred(self) -> bool:
+        """
+        Whether missing portal users are left to the provisioning cron. The
+        ``defer_portal_provisioning`` context key (e.g. for bulk imports) overrides the
+        ``university.portal_provisioning`` system parameter.
+        """
+        if 'defer_portal_provisioning' in self.env.context:
+            return bool(self.env.context['defer_portal_provisioning'])
+        # sudo(): reading system parameters is restricted to administrators
+        mode = self.env['ir.config_parameter'].sudo().get_param(_PORTAL_PROVISIONING_PARAM, 'immediate')
+        return mode == 'deferred'
+
+    @api.model
+    def _get_portal_user_map(
+        self, emails: list[str], create_missing: bool = True,
+    ) -> tuple[dict[str, int], dict[str, str]]:
+        """
+        Maps emails to the users logging in with them, creating the missing portal users
+        with a single batched create when asked and inviting them to choose a password.
+        An invitation that cannot be queued never prevents the users from being created.
+
+        Args:
+            emails (list[str]): Logins to resolve.
+            create_missing (bool): Create a portal user for every unknown email.
+
+        Returns:
+            tuple[dict[str, int], dict[str, str]]: Mapping of email to res.users ID, and
+            mapping of email to the error of its invitation, if it could not be queued.
+
+        Raises:
+            UserError: If the portal group is missing.
+        """
+        portal_group = self.env.ref('base.group_portal', raise_if_not_found=False)
+        if not portal_group:
+            raise UserError(_("Critical Error: 'base.group_portal' is missing. The system cannot provision portal users."))
+
+        unique_emails = set(emails)
+        # sudo(): provisioning portal users requires elevated access beyond student creator's rights
+        existing_users = self.env['res.users'].sudo().search([('login', 'in', list(unique_emails))])
+        user_map = {u.login: u.id for u in existing_users}
+
+        invitation_errors = {}
+        emails_to_create = unique_emails - set(user_map.keys())
+        if create_missing and emails_to_create:
+            user_vals = [{
+                'name': email,
+                'login': email,
+                'email': email,
+                # group_ids: Many2many on res.users — set portal group as the only group (Odoo 19: groups_id → group_ids)
+                'group_ids': [(6, 0, [portal_group.id])],
+            } for email in emails_to_create]
+
+            # sudo(): creating res.users requires admin-level privileges
+            # No password: each student sets one through the auth_signup invitation, queued
+            # below in one batch instead of being sent inline, user by user, by the create hook
+            new_users = self.env['res.users'].sudo().with_context(no_reset_password=True).create(user_vals)
+            user_map.update({u.login: u.id for u in new_users})
+            error = self._queue_portal_invitations(new_users)
+            if error:
+                invitation_errors = dict.fromkeys(new_users.mapped('login'), error)
+        return user_map, invitation_errors
+
+    @api.model
+    def _queue_portal_invitations(self, users) -> str | None:
+        """
+        Queues the auth_signup invitations of new portal users in one batch, for the mail
+        queue to send them. If they cannot be queued, the signup is cancelled, as
+        ``res.users.create`` does when its own invitation fails.
+
+        Args:
+            users (Recordset): New res.users records, without password.
+
+        Returns:
+            str | None: Why the invitations could not be queued, if they could not.
+        """
+        template = self.env.ref('auth_signup.set_password_email', raise_if_not_found=False)
+        if not template:
+            return None
+        try:
+            with self.env.cr.savepoint():
+                users.partner_id.signup_prepare(signup_type='signup')
+                template.sudo().send_mail_batch(users.ids, force_send=False, email_values={
+                    'email_cc': False,
+                    'auto_delete': True,
+                    'message_type': 'user_notification',
+                    'recipient_ids': [],
+                    'partner_ids': [],
+                    'scheduled_date': False,
+                })
+        except Exception as e:
+            _logger.warning("Portal invitations could not be queued for %d users: %s", len(users), e)
+            users.partner_id.signup_cancel()
+            return _("Invitation not sent: %s", e)
+        return None
+
+    @api.model
+    def _cron_provision_portal_users(self) -> None:
+        """
+        Creates the portal users of pending students chunk by chunk until the time budget
+        runs out, committing after each chunk. Re-triggers itself while students remain.
+        """
+        deadline = time.monotonic() + _PORTAL_TIME_BUDGET
+        while time.monotonic() < deadline:
+            students = self.search([('portal_state', '=', 'pending')], order='id', limit=_PORTAL_CHUNK_SIZE)
+            if not students:
+                return
+            students._provision_portal_users()
+            self._commit_chunk()
+
+        if self.search_count([('portal_state', '=', 'pending')], limit=1):
+            self.env.ref('university.ir_cron_provision_portal_users')._trigger()
+
+    def _provision_portal_users(self) -> None:
+        """
+        Creates and links the portal users of these students in one batch. If the batch
+        is rejected, students are retried one by one so only the culprits are marked failed.
+        """
+        try:
+            with self.env.cr.savepoint():
+                self._link_portal_users()
+            return
+        except Exception:
+            _logger.info("Portal provisioning batch rejected, retrying %d students individually", len(self))
+
+        for student in self:
+            try:
+                with self.env.cr.savepoint():
+                    student._link_portal_users()
+            except Exception as e:
+                _logger.warning("Portal provisioning failed for student %s: %s", student.id, e)
+                student.write({'portal_state': 'failed', 'portal_error': str(e)})
+
+    def _link_portal_users(self) -> None:
+        """Links these students to their portal users, creating the missing ones."""
+        students = self.filtered('email')
+        user_map, invitation_errors = self._get_portal_user_map(students.mapped('email'))
+        # New users already link matching students on creation (res.users._sync_university_students)
+        self._set_portal_users({
+            student.id: user_map[student.email] for student in students if not student.user_id
+        })
+        uninvited = students.filtered(lambda s: s.email in invitation_errors)
+        for error, error_students in uninvited.grouped(lambda s: invitation_errors[s.email]).items():
+            error_students.write({'portal_error': error})
+        (self - students).write({'portal_state': 'none'})
+
+    @api.model
+    def _set_portal_users(self, links: dict[int, int]) -> None:
+        """
+        Links students to users with a single UPDATE, skipping students linked meanwhile,
+        then lets the ORM recompute what depends on the link (e.g. the portal keys of
+        enrollments and grades).
+
+        Args:
+            links (dict[int, int]): Mapping of student ID to res.users ID.
+        """
+        if not links:
+            return
+        self.flush_model(['user_id', 'portal_state', 'portal_error'])
+        self.env.cr.execute(SQL(
+            """
+            UPDATE %(table)s s
+               SET user_id = v.user_id, portal_state = 'done', portal_error = NULL,
+                   write_uid = %(uid)s, write_date = %(now)s
+              FROM unnest(%(ids)s::int[], %(user_ids)s::int[]) AS v(id, user_id)
+             WHERE s.id = v.id AND s.user_id IS NULL
+         RETURNING s.id
+            """,
+            table=SQL.identifier(self._table),
+            uid=self.env.uid,
+            now=self.env.cr.now(),
+            ids=list(links),
+            user_ids=list(links.values()),
+        ))
+        linked = self.browse(row[0] for row in self.env.cr.fetchall())
+        fnames = ['user_id', 'portal_state', 'portal_error', 'write_uid', 'write_date']
+        linked.invalidate_recordset(fnames)
+        linked.modified(fnames)
+
+    def action_retry_portal_provisioning(self) -> None:
+        """Queues failed portal accounts again and wakes the provisioning cron up."""
+        self.filtered(lambda s: s.portal_state == 'failed').write({'portal_state': 'pending', 'portal_error': False})
+        # sudo(): scheduling a cron trigger is restricted to administrators
+        self.env.ref('university.ir_cron_provision_portal_users').sudo()._trigger()
 
     def write(self, vals):
         """
@@ -225,6 +567,17 @@ class UniversityStudent(models.Model):
         Both the email AND login fields of the linked res.users are updated so
         the student can still log in after an email address change.
         """
+        if vals.get('report_pending'):
+            # A new report request starts over, even after a dead-lettered one
+            vals = {
+                'report_attempt_count': 0,
+                'report_next_attempt': False,
+                'report_failed': False,
+                'report_error': False,
+                **vals,
+            }
+        if 'user_id' in vals and 'portal_state' not in vals:
+            vals = {**vals, 'portal_state': 'done' if vals['user_id'] else 'none', 'portal_error': False}
         res = super().write(vals)
         if 'email' in vals:
             users_to_update = self.filtered('user_id').mapped('user_id').sudo()
@@ -233,13 +586,17 @@ class UniversityStudent(models.Model):
                     'email': vals['email'],
                     'login': vals['email'],
                 })
+        if 'university_id' in vals:
+            self.env['university.report']._refresh_rows('student_id', self.ids)
         return res
+
   
-    @api.depends('enrollment_ids', 'grade_ids')
+    @api.depends()
     def _compute_counts(self) -> None:
-        """Batch computes enrollment and grade counts linking them to the student."""
-        enroll_map = self._get_batch_counts('university.enrollment', 'student_id')
-        grade_map = self._get_batch_counts('university.grade', 'student_id')
+        """Batch computes enrollment and grade counts linking them to the student (stored, trigger-maintained)."""
+        counts = self._get_batch_counts_multi(list(self._batch_counters.values()))
+        enroll_map = counts[('university.enrollment', 'student_id')]
+        grade_map = counts[('university.grade', 'student_id')]
 
         for record in self:
             record.enrollment_count = enroll_map.get(record.id, 0)
@@ -269,52 +626,506 @@ class UniversityStudent(models.Model):
 
     def action_send_email_silent_js(self) -> str | bool:
         """
-        Pushes the academic report directly via the template preventing frontend blockage.
+        Queues the academic report for immediate delivery by the report cron and returns
+        at once: rendering and SMTP never run in the HTTP worker. The user is notified
+        through the bus when the report is delivered or fails.
 
         Returns:
-            str | bool: Target email address on success, False if no email configured.
+            str | bool: Target email address once queued, False if no email configured.
         """
         self.ensure_one()
         if not self.email:
             return False
-
-        template = self.env.ref('university.email_template_student_report')
-        template.send_mail(self.id, force_send=True)  # bypass mail queue for immediate delivery
+        self._enqueue_quick_reports()
         return self.email
 
-    @api.model
-    def _cron_process_pending_reports(self) -> None:
+    def action_send_reports(self) -> dict[str, Any]:
         """
-        Processes pending academic report emails in batches of 50 to avoid SMTP timeouts.
-        Only students whose email was queued successfully are marked as processed.
-        Failed sends retain report_pending=True so the next cron run retries them.
+        Queues the quick report of every selected student (list view action). Progress is
+        pushed to the user through the bus as the cron works through the selection.
         """
-        students = self.search([('report_pending', '=', True)], limit=50)
-        if not students:
+        students = self.filtered('email')
+        students._enqueue_quick_reports()
+        message = _("%(count)s academic reports queued. You will be notified as they are sent.", count=len(students))
+        if len(students) < len(self):
+            message += " " + _("%(count)s students without email were skipped.", count=len(self) - len(students))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': message,
+                'sticky': False,
+            },
+        }
+
+    def _enqueue_quick_reports(self) -> None:
+        """Flags the reports as pending on behalf of the current user and wakes the report cron up."""
+        if not self:
             return
+        self.write({'report_pending': True, 'report_requested_by': self.env.uid})
+        # sudo(): scheduling a cron trigger is restricted to administrators
+        self.env.ref('university.ir_cron_process_pending_reports').sudo()._trigger()
+
+    @api.model
+    def _cron_process_pending_reports(self) -> None:
+        """
+        Processes pending academic report emails in chunks until the time budget
+        (``university.report_cron_time_budget`` seconds) runs out.
 
+        Chunks are sized from the measured per-student render time so that each one lasts
+        about ``_REPORT_CHUNK_TARGET`` seconds, and every chunk is committed on its own so a
+        crash never redoes finished work. Failed sends are retried with an exponential
+        backoff and dead-lettered after ``university.report_max_attempts`` failures. If the
+        budget runs out with students still due, the cron re-triggers itself instead of
+        waiting for its next interval.
+        """
+        # sudo(): system parameters are not readable by regular users
+        budget = float(self.env['ir.config_parameter'].sudo().get_param(
+            _REPORT_BUDGET_PARAM, _REPORT_DEFAULT_BUDGET,
+        ))
+        deadline = time.monotonic() + budget
         template = self.env.ref('university.email_template_student_report')
 
+        seconds_per_student = None
+        while True:
+            remaining = deadline - time.monotonic()
+            chunk_size = _report_chunk_size(seconds_per_student)
+            if seconds_per_student:
+                # Never start a chunk the remaining budget cannot cover
+                chunk_size = min(chunk_size, int(remaining / seconds_per_student))
+            if remaining <= 0 or chunk_size < 1:
+                break
+
+            students = self._claim_pending_reports(chunk_size)
+            if not students:
+                return
+
+            started = time.monotonic()
+            students._send_pending_reports(template)
+            elapsed = time.monotonic() - started
+            seconds_per_student = elapsed / len(students)
+
+            self._commit_chunk()
+            _logger.info("Processed %d pending reports in %.1fs", len(students), elapsed)
+
+        if self.search_count(self._get_due_report_domain(), limit=1):
+            _logger.info("Report cron time budget exhausted, re-triggering for the remaining backlog")
+            self.env.ref('university.ir_cron_process_pending_reports')._trigger()
+
+    @api.model
+    def _get_due_report_domain(self) -> list:
+        """Domain of the pending students a worker may claim now (same filter as the claim query)."""
+        now = fields.Datetime.now()
+        return [
+            ('report_pending', '=', True),
+            ('report_failed', '=', False),
+            '|', ('report_claimed_until', '=', False), ('report_claimed_until', '<', now),
+            '|', ('report_next_attempt', '=', False), ('report_next_attempt', '<=', now),
+        ]
+
+    @api.model
+    def _claim_pending_reports(self, limit: int) -> 'UniversityStudent':
+        """
+        Claims up to ``limit`` due pending students for this worker. Dead-lettered students
+        and those waiting for their retry backoff are skipped.
+
+        Rows are picked with FOR UPDATE SKIP LOCKED, so concurrent workers never wait on
+        nor pick the same students, and stamped with a lease that is committed right away:
+        the lease keeps other workers off the students once the row locks are released,
+        and expires by itself if this worker crashes.
+
+        Args:
+            limit (int): Maximum number of students to claim.
+
+        Returns:
+            UniversityStudent: The claimed students.
+        """
+        self.flush_model(['report_pending', 'report_claimed_until', 'report_next_attempt', 'report_failed'])
+        now = fields.Datetime.now()
+        self.env.cr.execute(SQL(
+            """
+            UPDATE %(table)s
+               SET report_claimed_until = %(lease_until)s
+             WHERE id IN (
+                    SELECT id FROM %(table)s
+                     WHERE report_pending
+                       AND report_failed IS NOT TRUE
+                       AND (report_claimed_until IS NULL OR report_claimed_until < %(now)s)
+                       AND (report_next_attempt IS NULL OR report_next_attempt <= %(now)s)
+                     -- quick reports somebody is waiting for go first
+                     ORDER BY report_requested_by IS NULL, id
+                     LIMIT %(limit)s
+                       FOR UPDATE SKIP LOCKED
+                   )
+            RETURNING id
+            """,
+            table=SQL.identifier(self._table),
+            lease_until=now + _REPORT_CLAIM_LEASE,
+            now=now,
+            limit=limit,
+        ))
+        students = self.browse(row[0] for row in self.env.cr.fetchall())
+        students.invalidate_recordset(['report_claimed_until'])
+        self._commit_chunk()
+        return students
+
+    def _send_pending_reports(self, template) -> None:
+        """
+        Queues the academic report of these students and clears their pending flag.
+        Only students whose email was queued successfully are marked as processed;
+        the others go through _register_report_failure().
+
+        The PDFs are rendered ahead in batches sharing one wkhtmltopdf run, and handed
+        to the template through the context so each mail attaches its own piece.
+
+        Quick reports requested by a user are sent right away, so that the bus notification
+        sent to the requester reflects the actual delivery.
+        """
         success_ids: set[int] = set()
         error_ids: set[int] = set()
+        requesters = {student.id: student.report_requested_by for student in self if student.report_requested_by}
 
-        for student in students:
-            try:
-                # force_send=False: delegate to mail queue for reliability under load
-                template.send_mail(student.id, force_send=False)
-                success_ids.add(student.id)
-            except Exception as e:
-                error_msg = f"Error generating/sending automatic report: {e}"
-                _logger.error(
-                    "Failed to generate report for Student %s: %s",
-                    student.id, error_msg, exc_info=True
-                )
-                error_ids.add(student.id)
-                student.message_post(body=error_msg, message_type='comment')
+        for batch in split_every(_REPORT_RENDER_BATCH, self.ids, self.browse):
+            pdfs = self.env['ir.actions.report']._render_student_report_pdfs(batch.ids)
+            batch_template = template.with_context(university_report_pdfs=pdfs) if pdfs else template
+            for student in batch:
+                try:
+                    # Savepoint: a database error must not abort the transaction, so the
+                    # failure can still be recorded and the rest of the chunk processed
+                    with self.env.cr.savepoint():
+                        # force_send=False: delegate bulk reports to the mail queue for reliability under load
+                        mail_id = batch_template.send_mail(student.id, force_send=student.id in requesters)
+                    mail = self.env['mail.mail'].sudo().browse(mail_id).exists()
+                    if mail and mail.state == 'exception':
+                        raise UserError(mail.failure_reason or _("The email could not be delivered."))
+                    success_ids.add(student.id)
+                except Exception as e:
+                    _logger.warning("Failed to generate report for Student %s", student.id, exc_info=True)
+                    student._register_report_failure(str(e))
+                    error_ids.add(student.id)
 
         if success_ids:
-            self.browse(list(success_ids)).write({'report_pending': False})
+            self.browse(list(success_ids))._record_sent_fingerprints()
+            self.browse(list(success_ids)).write({
+                'report_pending': False,
+                'report_claimed_until': False,
+                'report_attempt_count': 0,
+                'report_next_attempt': False,
+                'report_error': False,
+                'report_requested_by': False,
+            })
+        if requesters:
+            self._notify_report_requesters(requesters, success_ids, error_ids)
+
+    def _notify_report_requesters(self, requesters: dict, success_ids: set[int], error_ids: set[int]) -> None:
+        """
+        Tells each requesting user how their quick reports went, through the bus: the
+        outcome of a single report, or the progress of a multi-student request.
+
+        Args:
+            requesters (dict): Mapping of processed student IDs to the res.users who requested them.
+            success_ids (set[int]): Students whose report was delivered.
+            error_ids (set[int]): Students whose report failed in this chunk.
+        """
+        student_ids_by_user = defaultdict(list)
+        for student_id, user in requesters.items():
+            student_ids_by_user[user].append(student_id)
+
+        for user, student_ids in student_ids_by_user.items():
+            remaining = self.search_count([
+                ('id', 'not in', student_ids),
+                ('report_requested_by', '=', user.id),
+                ('report_pending', '=', True),
+                ('report_failed', '=', False),
+            ])
+            sent = [student_id for student_id in student_ids if student_id in success_ids]
+            failed = [student_id for student_id in student_ids if student_id in error_ids]
+
+            if len(student_ids) == 1 and not remaining:
+                student = self.browse(student_ids)
+                if sent:
+                    payload = {
+                        'type': 'success',
+                        'message': _("The academic report has been sent to %s.", student.email),
+                    }
+                else:
+                    payload = {
+                        'type': 'danger',
+                        'message': _(
+                            "The academic report of %(student)s could not be sent: %(error)s",
+                            student=student.name,
+                            error=student.report_error,
+                        ),
+                    }
+                    if not student.report_failed:
+                        payload['message'] += " " + _("It will be retried automatically.")
+            else:
+                payload = {
+                    'type': 'warning' if failed else 'info',
+                    'message': _(
+                        "Academic reports: %(sent)s sent, %(failed)s failed, %(remaining)s remaining.",
+                        sent=len(sent),
+                        failed=len(failed),
+                        remaining=remaining,
+                    ),
+                }
+            user._bus_send('simple_notification', {**payload, 'title': _("Academic Report"), 'sticky': False})
+
+    def _register_report_failure(self, error: str) -> None:
+        """
+        Records a failed report attempt: schedules the next one with an exponential
+        backoff, or dead-letters the student once the maximum number of attempts is reached.
+        Only dead-lettering posts to the chatter, so retries do not flood it.
+        """
+        self.ensure_one()
+        # sudo(): system parameters are not readable by regular users
+        max_attempts = int(self.env['ir.config_parameter'].sudo().get_param(
+            _REPORT_MAX_ATTEMPTS_PARAM, _REPORT_DEFAULT_MAX_ATTEMPTS,
+        ))
+        attempts = self.report_attempt_count + 1
+        vals = {
+            'report_attempt_count': attempts,
+            'report_claimed_until': False,
+            'report_error': error,
+        }
+        if attempts >= max_attempts:
+            vals.update(report_failed=True, report_next_attempt=False, report_requested_by=False)
+            self.write(vals)
+            self.message_post(body=_(
+                "The academic report could not be generated after %(attempts)s attempts "
+                "and will not be retried automatically: %(error)s",
+                attempts=attempts,
+                error=error,
+            ))
+            return
+
+        delay = min(_REPORT_RETRY_DELAY * 2 ** (attempts - 1), _REPORT_RETRY_MAX_DELAY)
+        vals['report_next_attempt'] = fields.Datetime.now() + delay
+        self.write(vals)
 
+    def action_retry_report(self) -> None:
+        """Puts dead-lettered (or backing-off) reports back in the queue for the next cron run."""
+        self.write({'report_pending': True})
+        # sudo(): scheduling a cron trigger is restricted to administrators
+        self.env.ref('university.ir_cron_process_pending_reports').sudo()._trigger()
+
+    def _get_transcript_data(self) -> dict[int, dict[str, list[dict[str, Any]]]]:
+        """
+        Loads the transcript of these students with a single query, whatever their number:
+        one row per grade, carrying its enrollment's subject, professor and average (window
+        AVG), folded into plain dictionaries.
+
+        Raw SQL bypasses record rules: callers must only pass students the user may read.
+
+        Returns:
+            dict[int, dict]: Per student ID, ``summary`` (one entry per graded enrollment with
+            subject, professor and average) and ``grades`` (date, subject, professor, score).
+        """
+        transcripts = {student_id: {'summary': [], 'grades': []} for student_id in self.ids}
+        if not self.ids:
+            return transcripts
+        for model_name in ('university.enrollment', 'university.grade', 'university.subject',
+                           'university.professor'):
+            self.env[model_name].flush_model()
+
+        self.env.cr.execute(SQL(
+            """
+            SELECT e.student_id, e.id, sub.name, p.name, g.date, g.score,
+                   AVG(g.score) OVER (PARTITION BY e.id)
+              FROM university_enrollment e
+              JOIN university_grade g ON g.enrollment_id = e.id
+              JOIN university_subject sub ON sub.id = e.subject_id
+         LEFT JOIN university_professor p ON p.id = e.professor_id
+             WHERE e.student_id = ANY(%s)
+          ORDER BY e.student_id, e.id, g.id
+            """,
+            self.ids,
+        ))
+        last_enrollment_id = None
+        for student_id, enrollment_id, subject, professor, date, score, average in self.env.cr.fetchall():
+            transcript = transcripts[student_id]
+            if enrollment_id != last_enrollment_id:
+                transcript['summary'].append({
+                    'subject': subject,
+                    'professor': professor or 'N/A',
+                    'average': average or 0.0,
+                })
+                last_enrollment_id = enrollment_id
+            transcript['grades'].append({
+                'date': date,
+                'subject': subject,
+                'professor': professor or '',
+                'score': score or 0.0,
+            })
+        return transcripts
+
+    def _get_report_fingerprints(self) -> dict[int, str]:
+        """
+        Hashes, in one query, the content the academic report of these students shows:
+        personal data, tutor, university, enrollments (with subject and professor) and
+        grades, plus the report template itself. Edits that leave that content unchanged
+        (e.g. a grade corrected back) keep the fingerprint.
+
+        Returns:
+            dict[int, str]: Mapping of student IDs to the fingerprint of their report.
+        """
+        if not self.ids:
+            return {}
+        for model_name in ('university.student', 'university.enrollment', 'university.grade',
+                           'university.subject', 'university.professor', 'university.university'):
+            self.env[model_name].flush_model()
+        template = self.env.ref('university.report_student_template', raise_if_not_found=False)
+
+        self.env.cr.execute(SQL(
+            """
+            SELECT s.id, md5(concat_ws('|',
+                       %(template_stamp)s, s.name, s.email, s.street, s.city, s.zip_code,
+                       s.state_id, t.name, u.name, u.write_date,
+                       (SELECT string_agg(concat_ws(',', e.id, sub.name, p.name), ';' ORDER BY e.id)
+                          FROM university_enrollment e
+                          JOIN university_subject sub ON sub.id = e.subject_id
+                     LEFT JOIN university_professor p ON p.id = e.professor_id
+                         WHERE e.student_id = s.id),
+                       (SELECT string_agg(concat_ws(',', g.id, g.enrollment_id, g.date, g.score), ';' ORDER BY g.id)
+                          FROM university_grade g
+                         WHERE g.student_id = s.id)
+                   ))
+              FROM university_student s
+              JOIN university_university u ON u.id = s.university_id
+         LEFT JOIN university_professor t ON t.id = s.tutor_id
+             WHERE s.id = ANY(%(ids)s)
+            """,
+            template_stamp=str(template.write_date) if template else '',
+            ids=self.ids,
+        ))
+        return dict(self.env.cr.fetchall())
+
+    def _get_cached_report_pdfs(self, fingerprints: dict[int, str]) -> dict[int, bytes]:
+        """Returns the cached PDFs of these students whose fingerprint still matches."""
+        # sudo(): the cache is technical data, restricted to administrators
+        cached = self.sudo().filtered(
+            lambda student: student.report_pdf_fingerprint
+            and student.report_pdf_fingerprint == fingerprints.get(student.id)
+        )
+        return {
+            student.id: base64.b64decode(student.with_context(bin_size=False).report_pdf_cache)
+            for student in cached
+        }
+
+    def _store_report_pdfs(self, pdfs: dict[int, bytes], fingerprints: dict[int, str]) -> None:
+        """Caches freshly rendered PDFs under the fingerprint of the data they were rendered from."""
+        if not pdfs or self.env.cr.readonly:
+            return
+        now = fields.Datetime.now()
+        # sudo(): the cache is maintained whatever the rights of the user printing the report
+        for student in self.sudo().browse(pdfs):
+            if fingerprints.get(student.id):
+                student.write({
+                    'report_pdf_cache': base64.b64encode(pdfs[student.id]),
+                    'report_pdf_fingerprint': fingerprints[student.id],
+                    'report_pdf_cached_at': now,
+                })
+
+    def _record_sent_fingerprints(self) -> None:
+        """Remembers what these students just received, in one statement, and clears their changed flag."""
+        fingerprints = self._get_report_fingerprints()
+        if not fingerprints:
+            return
+        self.env.cr.execute(SQL(
+            """
+            UPDATE %(table)s s
+               SET report_sent_fingerprint = v.fingerprint, report_dirty = FALSE
+              FROM unnest(%(ids)s::int[], %(fingerprints)s::varchar[]) AS v(id, fingerprint)
+             WHERE s.id = v.id
+            """,
+            table=SQL.identifier(self._table),
+            ids=list(fingerprints),
+            fingerprints=list(fingerprints.values()),
+        ))
+        self.invalidate_recordset(['report_sent_fingerprint', 'report_dirty'])
+
+    @api.model
+    def action_report_changed_students(self) -> dict[str, Any]:
+        """
+        Flags for sending the students whose academic record differs from the last report
+        they received. Only students marked as changed by grade/enrollment writes are
+        fingerprinted; those whose change was reverted just lose the mark.
+        """
+        flagged = 0
+        changed = self.search([('report_dirty', '=', True), ('report_pending', '=', False)])
+        for batch in split_every(_REPORT_CHUNK_MAX, changed.ids, self.browse):
+            fingerprints = batch._get_report_fingerprints()
+            to_report = batch.filtered(lambda student: student.report_sent_fingerprint != fingerprints.get(student.id))
+            to_report.write({'report_pending': True})
+            (batch - to_report).write({'report_dirty': False})
+            flagged += len(to_report)
+        if flagged:
+            # sudo(): scheduling a cron trigger is restricted to administrators
+            self.env.ref('university.ir_cron_process_pending_reports').sudo()._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'message': _("%(count)s students with a changed academic record will receive their report.",
+                             count=flagged),
+                'sticky': False,
+            },
+        }
+
+    def _mark_academic_record_changed(self) -> None:
+        """Called when grades or enrollments of these students change."""
+        self.env['university.grade.statistics']._mark_stale()
+        self._invalidate_report_pdf_cache()
+        # sudo(): grading users may change the flag through their grades, not directly
+        unmarked = self.sudo().filtered(lambda student: not student.report_dirty)
+        if unmarked:
+            unmarked.write({'report_dirty': True})
+
+    def _invalidate_report_pdf_cache(self) -> None:
+        """Drops the cached report PDFs of these students (their grades or enrollments changed)."""
+        # sudo(): grading users cannot read the cache fields, but their changes must drop it
+        cached = self.sudo().filtered('report_pdf_fingerprint')
+        if cached:
+            cached.write(_REPORT_CACHE_CLEAR)
+
+    @api.model
+    def _cron_evict_report_pdf_cache(self) -> None:
+        """
+        Evicts cached report PDFs older than ``university.report_pdf_cache_max_age_days``,
+        then the least recently rendered ones until the cache fits in
+        ``university.report_pdf_cache_max_mb``.
+        """
+        # sudo(): system parameters are not readable by regular users
+        params = self.env['ir.config_parameter'].sudo()
+        max_age = int(params.get_param(_REPORT_CACHE_MAX_AGE_PARAM, _REPORT_CACHE_DEFAULT_MAX_AGE))
+        max_size = int(params.get_param(_REPORT_CACHE_MAX_SIZE_PARAM, _REPORT_CACHE_DEFAULT_MAX_SIZE)) * 1024 * 1024
+
+        students = self.sudo()
+        expired = students.search([('report_pdf_cached_at', '<', fields.Datetime.now() - timedelta(days=max_age))])
+
+        self.env['ir.attachment'].flush_model(['res_model', 'res_field', 'res_id', 'file_size'])
+        self.flush_model(['report_pdf_cached_at'])
+        self.env.cr.execute(SQL(
+            """
+            SELECT student_id
+              FROM (SELECT s.id AS student_id,
+                           SUM(a.file_size) OVER (ORDER BY s.report_pdf_cached_at DESC, s.id DESC) AS total_size
+                      FROM ir_attachment a
+                      JOIN university_student s ON s.id = a.res_id
+                     WHERE a.res_model = %(model)s AND a.res_field = 'report_pdf_cache') sizes
+             WHERE total_size > %(max_size)s
+            """,
+            model=self._name,
+            max_size=max_size,
+        ))
+        oversized = students.browse(row[0] for row in self.env.cr.fetchall())
+
+        to_evict = expired | oversized
+        for batch in split_every(_REPORT_CHUNK_MAX, to_evict.ids, students.browse):
+            batch.write(_REPORT_CACHE_CLEAR)
+        _logger.info("Evicted %d cached academic report PDFs", len(to_evict))
 
 
 class ResUsers(models.Model):
@@ -323,32 +1134,34 @@ class ResUsers(models.Model):
 
     def _sync_university_students(self):
         """
-        Links unlinked students to newly created/updated users by matching on email.
-        Uses defaultdict to handle multiple students sharing the same email gracefully.
+        Links unlinked students to newly created/updated users by matching on email, then login.
+        Matches are resolved from a single query and written with a single UPDATE, however
+        many users are synchronized. Uses defaultdict to handle multiple students sharing
+        the same email gracefully.
         """
-        emails = [e for u in self for e in (u.login, u.email) if e]
+        emails = {e for u in self for e in (u.login, u.email) if e}
         if not emails:
             return
 
         # sudo(): cross-user student lookup — a user provisioner may not see all students
-        students = self.env['university.student'].sudo().search([
-            ('email', 'in', emails),
-            ('user_id', '=', False)
-        ])
-
+        Student = self.env['university.student'].sudo()
+        students = Student.search_fetch(
+            [('email', 'in', list(emails)), ('user_id', '=', False)], ['email'], order='id',
+        )
         if not students:
             return
 
-        # Group students by email to handle edge case of duplicate emails: {email: [student1, ...]}
+        # Group students by email to handle edge case of duplicate emails: {email: [student_id, ...]}
         student_map = defaultdict(list)
         for s in students:
-            student_map[s.email].append(s)
+            student_map[s.email].append(s.id)
 
+        links = {}
         for user in self:
             matches = student_map.get(user.email) or student_map.get(user.login)
             if matches:
-                match = matches.pop(0)  # take the first match; remaining stay unlinked
-                match.user_id = user.id
+                links[matches.pop(0)] = user.id  # take the first match; remaining stay unlinked
+        Student._set_portal_users(links)
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -361,7 +1174,21 @@ class ResUsers(models.Model):
         """Hooks onto credentials modifications binding orphaned students if matches resurface."""
         res = super().write(vals)
         if 'login' in vals or 'email' in vals:
-            portal_users = self.filtered(lambda u: u.has_group('base.group_portal'))
+            # Group membership of the whole recordset in one query, not one has_group() per user
+            # sudo(): users may update their own credentials without being allowed to search users
+            portal_group = self.env.ref('base.group_portal', raise_if_not_found=False)
+            portal_users = portal_group and self.sudo().with_context(active_test=False).search([
+                ('id', 'in', self.ids), ('group_ids', 'in', portal_group.id),
+            ])
             if portal_users:
                 portal_users._sync_university_students()
-        return res
\ No newline at end of file
+        return res
+
+
+def _report_chunk_size(seconds_per_student: float | None) -> int:
+    """Sizes a report chunk to last about _REPORT_CHUNK_TARGET seconds at the measured rate."""
+    if seconds_per_student is None:
+        return _REPORT_CHUNK_MIN  # nothing measured yet: probe with a small chunk
+    if seconds_per_student <= 0:
+        return _REPORT_CHUNK_MAX
+    return max(_REPORT_CHUNK_MIN, min(_REPORT_CHUNK_MAX, int(_REPORT_CHUNK_TARGET / seconds_per_student)))
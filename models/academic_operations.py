@@ -1,22 +1,37 @@
 import logging
-from typing import Any
+from collections import Counter, defaultdict
+from typing import Any, Iterable, Iterator
 
-from odoo import models, fields, api, _
-from odoo.exceptions import UserError, ValidationError
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
 
 _logger = logging.getLogger(__name__)
 
 _ENROLLMENT_CODE_NEW = 'New'
+_ENROLLMENT_SEQUENCE_PREFIX = 'enrollment.subject.'
+# Cursor cache key of the subject sequences created by the current transaction
+_NEW_SEQUENCES_CACHE_KEY = 'university.new_enrollment_sequences'
+
+# Enrollment fields feeding a university.report row
+_REPORT_ENROLLMENT_FIELDS = {'student_id', 'subject_id', 'professor_id'}
 
 # Subject
 class Subject(models.Model):
     """Represents subjects taught at the university."""
     _name = 'university.subject'
-    _inherit = ['batch.count.mixin']
+    _inherit = ['batch.count.mixin', 'university.ranked.search.mixin', 'university.batch.constraint.mixin']
     _description = 'Subject'
+    _batch_counters = {
+        'enrollment_count': ('university.enrollment', 'subject_id'),
+    }
+    _rec_names_search = ['name', 'code']
+    _ranked_search_fields = ('name', 'code')
 
-    name = fields.Char(string='Name', required=True, index=True)
-    code = fields.Char(string='Code', required=True, index=True)
+    # Trigram indexes: GIN pg_trgm indexes also answer equality, so code lookups stay indexed
+    name = fields.Char(string='Name', required=True, index='trigram')
+    code = fields.Char(string='Code', required=True, index='trigram')
 
     department_id = fields.Many2one('university.department', string='Department', required=True, index=True, ondelete='cascade')
     university_id = fields.Many2one(
@@ -34,11 +49,11 @@ class Subject(models.Model):
     enrollment_ids = fields.One2many('university.enrollment', 'subject_id', string='Enrollments')
 
 
-    enrollment_count = fields.Integer(compute='_compute_counts', string='Enrollment Count')
+    enrollment_count = fields.Integer(compute='_compute_counts', store=True, string='Enrollment Count')
 
-    @api.depends('enrollment_ids')
+    @api.depends()
     def _compute_counts(self) -> None:
-        """Computes the number of enrollments for this subject."""
+        """Computes the number of enrollments for this subject (stored, trigger-maintained)."""
         counts = self._get_batch_counts('university.enrollment', 'subject_id')
         for record in self:
             record.enrollment_count = counts.get(record.id, 0)
@@ -51,15 +66,46 @@ class Subject(models.Model):
         Raises:
             ValidationError: If any professor belongs to a different university.
         """
-        for record in self:
-            if record.university_id and any(prof.university_id != record.university_id for prof in record.professor_ids):
-                raise ValidationError(_("All professors assigned to the subject must belong to the same university."))
+        relation = self._fields['professor_ids']
+        violators = self._get_constraint_violators(SQL(
+            """
+            SELECT DISTINCT s.id
+              FROM %(subject)s s
+              JOIN %(relation)s rel ON rel.%(subject_column)s = s.id
+              JOIN %(professor)s p ON p.id = rel.%(professor_column)s
+             WHERE s.id = ANY(%(ids)s) AND s.university_id IS NOT NULL
+               AND p.university_id IS DISTINCT FROM s.university_id
+            """,
+            subject=SQL.identifier(self._table),
+            relation=SQL.identifier(relation.relation),
+            subject_column=SQL.identifier(relation.column1),
+            professor_column=SQL.identifier(relation.column2),
+            professor=SQL.identifier(self.env['university.professor']._table),
+            ids=self.ids,
+        ), ('university.professor',))
+        violators._raise_constraint_violations(
+            _("All professors assigned to the subject must belong to the same university."),
+        )
+
+    def write(self, vals):
+        """Regroups the grade statistics of subjects moving to another department."""
+        res = super().write(vals)
+        if 'department_id' in vals:
+            self.env['university.grade.statistics']._mark_stale()
+        return res
+
+    def unlink(self):
+        """Deleting subjects deletes their enrollments and grades with them."""
+        res = super().unlink()
+        self.env['university.grade.statistics']._mark_stale()
+        return res
 
 
 # Enrollment
 class Enrollment(models.Model):
     """Manages student enrollments in subjects."""
     _name = 'university.enrollment'
+    _inherit = ['batch.count.mixin', 'university.batch.constraint.mixin']
     _description = 'Enrollment'
     _rec_name = 'code'
 
@@ -89,6 +135,14 @@ class Enrollment(models.Model):
         domain="[('university_id', '=', university_id)]",
     )
     grade_ids = fields.One2many('university.grade', 'enrollment_id', string='Grades')
+    # Denormalized portal key: the portal record rules filter on it with one indexed equality
+    user_id = fields.Many2one(
+        'res.users',
+        string='Portal User',
+        related='student_id.user_id',
+        store=True,
+        index='btree_not_null',
+    )
 
 
     _sql_constraints = [
@@ -138,9 +192,20 @@ class Enrollment(models.Model):
         Raises:
             ValidationError: If the professor belongs to a different university.
         """
-        for record in self:
-            if record.professor_id and record.professor_id.university_id != record.university_id:
-                raise ValidationError(_("The professor must belong to the same university as the enrollment."))
+        violators = self._get_constraint_violators(SQL(
+            """
+            SELECT e.id
+              FROM %(enrollment)s e
+              JOIN %(professor)s p ON p.id = e.professor_id
+             WHERE e.id = ANY(%(ids)s) AND p.university_id IS DISTINCT FROM e.university_id
+            """,
+            enrollment=SQL.identifier(self._table),
+            professor=SQL.identifier(self.env['university.professor']._table),
+            ids=self.ids,
+        ), ('university.professor',))
+        violators._raise_constraint_violations(
+            _("The professor must belong to the same university as the enrollment."),
+        )
 
     @api.constrains('professor_id', 'subject_id')
     def _check_professor_teaches_subject(self) -> None:
@@ -152,18 +217,31 @@ class Enrollment(models.Model):
         Raises:
             ValidationError: If the professor does not teach the subject.
         """
-        for record in self:
-            if (
-                record.professor_id
-                and record.subject_id
-                and record.professor_id not in record.subject_id.professor_ids
-            ):
-                raise ValidationError(_(
-                    "Professor '%(professor)s' does not teach '%(subject)s'. "
-                    "Only professors assigned to the subject can be selected.",
-                    professor=record.professor_id.name,
-                    subject=record.subject_id.name,
-                ))
+        relation = self.env['university.subject']._fields['professor_ids']
+        violators = self._get_constraint_violators(SQL(
+            """
+            SELECT e.id
+              FROM %(enrollment)s e
+             WHERE e.id = ANY(%(ids)s) AND e.professor_id IS NOT NULL AND e.subject_id IS NOT NULL
+               AND NOT EXISTS (SELECT 1
+                                 FROM %(relation)s rel
+                                WHERE rel.%(subject_column)s = e.subject_id
+                                  AND rel.%(professor_column)s = e.professor_id)
+            """,
+            enrollment=SQL.identifier(self._table),
+            relation=SQL.identifier(relation.relation),
+            subject_column=SQL.identifier(relation.column1),
+            professor_column=SQL.identifier(relation.column2),
+            ids=self.ids,
+        ), ('university.subject', 'university.professor'))
+        violators._raise_constraint_violations(
+            _("Only professors assigned to the subject can be selected. These professors do not teach their subject:"),
+            lambda record: _(
+                "Professor '%(professor)s' does not teach '%(subject)s'.",
+                professor=record.professor_id.name,
+                subject=record.subject_id.name,
+            ),
+        )
 
     @api.constrains('student_id', 'university_id')
     def _check_student_university(self) -> None:
@@ -173,13 +251,21 @@ class Enrollment(models.Model):
         Raises:
             ValidationError: If the student belongs to a different university.
         """
-        for record in self:
-            if (
-                record.student_id
-                and record.student_id.university_id
-                and record.student_id.university_id != record.university_id
-            ):
-                raise ValidationError(_("The student must belong to the same university as the enrollment."))
+        violators = self._get_constraint_violators(SQL(
+            """
+            SELECT e.id
+              FROM %(enrollment)s e
+              JOIN %(student)s s ON s.id = e.student_id
+             WHERE e.id = ANY(%(ids)s) AND s.university_id IS NOT NULL
+               AND s.university_id IS DISTINCT FROM e.university_id
+            """,
+            enrollment=SQL.identifier(self._table),
+            student=SQL.identifier(self.env['university.student']._table),
+            ids=self.ids,
+        ), ('university.student',))
+        violators._raise_constraint_violations(
+            _("The student must belong to the same university as the enrollment."),
+        )
 
     @api.constrains('subject_id', 'university_id')
     def _check_subject_university(self) -> None:
@@ -189,9 +275,20 @@ class Enrollment(models.Model):
         Raises:
             ValidationError: If the subject belongs to a different university.
         """
-        for record in self:
-            if record.subject_id and record.subject_id.university_id != record.university_id:
-                raise ValidationError(_("The subject must belong to the same university as the enrollment."))
+        violators = self._get_constraint_violators(SQL(
+            """
+            SELECT e.id
+              FROM %(enrollment)s e
+              JOIN %(subject)s s ON s.id = e.subject_id
+             WHERE e.id = ANY(%(ids)s) AND s.university_id IS DISTINCT FROM e.university_id
+            """,
+            enrollment=SQL.identifier(self._table),
+            subject=SQL.identifier(self.env['university.subject']._table),
+            ids=self.ids,
+        ), ('university.subject',))
+        violators._raise_constraint_violations(
+            _("The subject must belong to the same university as the enrollment."),
+        )
 
     @api.model_create_multi
     def create(self, vals_list: list[dict[str, Any]]) -> Any:
@@ -204,54 +301,196 @@ class Enrollment(models.Model):
         Returns:
             Any: Created enrollments.
         """
-        # Extract unique subject IDs
-        subject_ids = {
-            vals['subject_id'] 
-            for vals in vals_list 
+        # Count the codes each subject needs, then reserve them in one round trip
+        code_counts = Counter(
+            vals['subject_id']
+            for vals in vals_list
             if vals.get('code', _ENROLLMENT_CODE_NEW) == _ENROLLMENT_CODE_NEW and vals.get('subject_id')
-        }
-        
-        if subject_ids:
-            subjects = self.env['university.subject'].browse(list(subject_ids))
-            seq_map = {}
-            
-            # Find or create sequences — savepoint guards against TOCTOU race condition:
-            # two concurrent requests may both find no sequence and attempt creation;
-            # the savepoint rolls back the loser's INSERT and lets it re-read the winner's row.
-            for subject in subjects:
-                seq_code = f"enrollment.subject.{subject.id}"
-                seq = self.env['ir.sequence'].sudo().search([('code', '=', seq_code)], limit=1)
-
-                if not seq:
-                    prefix_str = (subject.name[:3].upper() if subject.name else 'UNK')
-                    try:
-                        with self.env.cr.savepoint():
-                            seq = self.env['ir.sequence'].sudo().create({
-                                'name': f'Enrollment Sequence {subject.name}',
-                                'code': seq_code,
-                                'prefix': f"{prefix_str}/%(year)s/",
-                                'padding': 4,
-                                'use_date_range': True,
-                            })
-                    except Exception:
-                        # Concurrent transaction won the race; discard and re-read
-                        seq = self.env['ir.sequence'].sudo().search([('code', '=', seq_code)], limit=1)
-                if not seq:
-                    raise UserError(_("Could not create or find sequence for subject '%s'. Please retry.") % subject.name)
-                seq_map[subject.id] = seq
-
-            # Assign codes in memory
+        )
+        if code_counts:
+            codes_by_subject = self._reserve_enrollment_codes(code_counts)
             for vals in vals_list:
                 if vals.get('code', _ENROLLMENT_CODE_NEW) == _ENROLLMENT_CODE_NEW and vals.get('subject_id'):
-                    vals['code'] = seq_map[vals['subject_id']].next_by_id()
-                    
-        return super().create(vals_list)
+                    vals['code'] = next(codes_by_subject[vals['subject_id']])
+
+        enrollments = super().create(vals_list)
+        self.env['university.report']._refresh_rows('id', enrollments.ids)
+        enrollments.student_id._mark_academic_record_changed()
+        return enrollments
+
+    @api.model
+    def _get_subject_sequence_id(self, subject_id: int) -> int | None:
+        """
+        Returns the ir.sequence ID numbering the enrollments of a subject, or None if the
+        subject has none yet. Only committed sequences are cached: misses are not kept, so
+        creating a sequence needs no cache invalidation, and the ones this transaction
+        created are kept on the cursor until it ends.
+        """
+        created = self.env.cr.cache.get(_NEW_SEQUENCES_CACHE_KEY, {})
+        if subject_id in created:
+            return created[subject_id]
+        try:
+            return self._get_cached_subject_sequence_id(subject_id)
+        except KeyError:
+            return None
+
+    @api.model
+    @tools.ormcache('subject_id')
+    def _get_cached_subject_sequence_id(self, subject_id: int) -> int:
+        """
+        Cached lookup of ``_get_subject_sequence_id``. Misses raise, so ormcache does not
+        keep them. The cache is cleared when such a sequence is renamed or deleted.
+
+        Raises:
+            KeyError: If the subject has no enrollment sequence.
+        """
+        # sudo(): ir.sequence is restricted to administrators
+        seq = self.env['ir.sequence'].sudo().search([('code', '=', f"{_ENROLLMENT_SEQUENCE_PREFIX}{subject_id}")], limit=1)
+        if not seq:
+            raise KeyError(subject_id)
+        return seq.id
+
+    @api.model
+    def _get_subject_sequences(self, subject_ids: Iterable[int]) -> dict[int, Any]:
+        """
+        Finds or creates the enrollment sequence of each subject.
+
+        Returns:
+            dict[int, Any]: Mapping of subject IDs to their ir.sequence record (sudo).
+        """
+        IrSequence = self.env['ir.sequence'].sudo()
+        seq_map = {}
+        for subject in self.env['university.subject'].browse(list(subject_ids)):
+            seq_id = self._get_subject_sequence_id(subject.id)
+            if seq_id:
+                seq_map[subject.id] = IrSequence.browse(seq_id)
+                continue
+
+            # Savepoint guards against TOCTOU race condition: two concurrent requests may both
+            # find no sequence and attempt creation; the savepoint rolls back the loser's INSERT
+            # and lets it re-read the winner's row.
+            seq_code = f"{_ENROLLMENT_SEQUENCE_PREFIX}{subject.id}"
+            prefix_str = (subject.name[:3].upper() if subject.name else 'UNK')
+            try:
+                with self.env.cr.savepoint():
+                    seq = IrSequence.create({
+                        'name': f'Enrollment Sequence {subject.name}',
+                        'code': seq_code,
+                        'prefix': f"{prefix_str}/%(year)s/",
+                        'padding': 4,
+                        'use_date_range': True,
+                    })
+                self._remember_new_subject_sequence(subject.id, seq.id)
+            except Exception:
+                # Concurrent transaction won the race; discard and re-read
+                seq = IrSequence.search([('code', '=', seq_code)], limit=1)
+            if not seq:
+                raise UserError(_("Could not create or find sequence for subject '%s'. Please retry.") % subject.name)
+            seq_map[subject.id] = seq
+        return seq_map
+
+    @api.model
+    def _remember_new_subject_sequence(self, subject_id: int, sequence_id: int) -> None:
+        """
+        Keeps a sequence created by this transaction out of the shared ormcache until the
+        transaction ends: other workers cannot see it before the commit, and it is gone
+        after a rollback.
+        """
+        cr = self.env.cr
+        if _NEW_SEQUENCES_CACHE_KEY not in cr.cache:
+            cr.postcommit.add(lambda: cr.cache.pop(_NEW_SEQUENCES_CACHE_KEY, None))
+            cr.postrollback.add(lambda: cr.cache.pop(_NEW_SEQUENCES_CACHE_KEY, None))
+        cr.cache.setdefault(_NEW_SEQUENCES_CACHE_KEY, {})[subject_id] = sequence_id
+
+    @api.model
+    def _reserve_enrollment_codes(self, code_counts: Counter) -> dict[int, Iterator[str]]:
+        """
+        Reserves the requested number of codes for every subject with a single nextval()
+        statement over the PostgreSQL sequences backing the subject ir.sequences, and
+        formats them in memory. Sequences are non-transactional, so concurrent
+        registrations never share a number; rolled-back transactions leave gaps, as before.
+
+        Args:
+            code_counts (Counter): Number of codes needed per subject ID.
+
+        Returns:
+            dict[int, Iterator[str]]: Iterator of formatted codes per subject ID.
+        """
+        seq_map = self._get_subject_sequences(code_counts)
+        sequence_date = self.env.context.get('ir_sequence_date') or fields.Date.today()
+
+        # Resolve the current date range of every date-ranged sequence with one search
+        dated = [seq for seq in seq_map.values() if seq.use_date_range]
+        date_ranges = {
+            date_range.sequence_id.id: date_range
+            for date_range in self.env['ir.sequence.date_range'].sudo().search([
+                ('sequence_id', 'in', [seq.id for seq in dated]),
+                ('date_from', '<=', sequence_date),
+                ('date_to', '>=', sequence_date),
+            ])
+        }
+        for seq in dated:
+            if seq.id not in date_ranges:
+                date_ranges[seq.id] = seq._create_date_range_seq(sequence_date)
+
+        codes_by_subject = {}
+        pg_sequences = {}
+        for subject_id, seq in seq_map.items():
+            if seq.implementation != 'standard':
+                # No-gap sequences are row-locked counters: keep the regular path
+                codes_by_subject[subject_id] = iter([seq.next_by_id() for _i in range(code_counts[subject_id])])
+                continue
+            date_range = date_ranges.get(seq.id)
+            if date_range:
+                pg_name = 'ir_sequence_%03d_%03d' % (seq.id, date_range.id)
+                formatter = seq.with_context(ir_sequence_date_range=date_range.date_from)
+            else:
+                pg_name = 'ir_sequence_%03d' % seq.id
+                formatter = seq
+            pg_sequences[subject_id] = (pg_name, formatter)
+
+        if pg_sequences:
+            subject_ids = list(pg_sequences)
+            self.env.cr.execute("""
+                SELECT r.subject_id, nextval(r.seq_name)
+                  FROM unnest(%s::int[], %s::text[], %s::int[]) AS r(subject_id, seq_name, amount),
+                       generate_series(1, r.amount)
+            """, [
+                subject_ids,
+                [pg_sequences[subject_id][0] for subject_id in subject_ids],
+                [code_counts[subject_id] for subject_id in subject_ids],
+            ])
+            numbers = defaultdict(list)
+            for subject_id, number in self.env.cr.fetchall():
+                numbers[subject_id].append(number)
+            for subject_id, (_pg_name, formatter) in pg_sequences.items():
+                codes_by_subject[subject_id] = iter([
+                    formatter.get_next_char(number) for number in sorted(numbers[subject_id])
+                ])
+        return codes_by_subject
+
+    def write(self, vals):
+        """Keeps the materialized academic report and the students' cached PDFs in sync."""
+        students = self.student_id
+        res = super().write(vals)
+        if _REPORT_ENROLLMENT_FIELDS.intersection(vals):
+            self.env['university.report']._refresh_rows('id', self.ids)
+        (students | self.student_id)._mark_academic_record_changed()
+        return res
+
+    def unlink(self):
+        """Drops the cached report PDFs of the students losing an enrollment."""
+        students = self.student_id
+        res = super().unlink()
+        students._mark_academic_record_changed()
+        return res
 
 
 # Grade
 class Grade(models.Model):
     """Records grades obtained in enrollments."""
     _name = 'university.grade'
+    _inherit = ['batch.count.mixin']
     _description = 'Grade'
 
     enrollment_id = fields.Many2one('university.enrollment', string='Enrollment', required=True, index=True, ondelete='cascade')
@@ -261,6 +500,14 @@ class Grade(models.Model):
         store=True,
         index=True,
     )
+    # Denormalized portal key: the portal record rules filter on it with one indexed equality
+    user_id = fields.Many2one(
+        'res.users',
+        string='Portal User',
+        related='student_id.user_id',
+        store=True,
+        index='btree_not_null',
+    )
 
     score = fields.Float(string='Score', index=True)
     date = fields.Date(string='Date', default=fields.Date.context_today)
@@ -270,8 +517,70 @@ class Grade(models.Model):
         ('score_range', 'CHECK(score >= 0 AND score <= 10)', 'Score must be between 0 and 10.'),
     ]
 
+    def init(self) -> None:
+        """Creates the composite index the keyset pages of /my/grades seek on."""
+        super().init()
+        create_index(self.env.cr, 'university_grade_student_date_id_index', self._table, ['student_id', 'date', 'id'])
+
     @api.depends('student_id.name', 'score')
     def _compute_display_name(self) -> None:
         """Generates the display name with student and score."""
         for record in self:
             record.display_name = f"{record.student_id.name or ''} - {record.score or 0.0}"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Refreshes the materialized report rows of the graded enrollments."""
+        grades = super().create(vals_list)
+        self.env['university.report']._refresh_rows('id', grades.enrollment_id.ids)
+        grades.student_id._mark_academic_record_changed()
+        return grades
+
+    def write(self, vals):
+        """Refreshes the report rows of both the previous and the new enrollments."""
+        students = self.student_id
+        if 'score' not in vals and 'enrollment_id' not in vals:
+            res = super().write(vals)
+            students._mark_academic_record_changed()
+            return res
+        enrollment_ids = self.enrollment_id.ids
+        res = super().write(vals)
+        self.env['university.report']._refresh_rows('id', enrollment_ids + self.enrollment_id.ids)
+        (students | self.student_id)._mark_academic_record_changed()
+        return res
+
+    def unlink(self):
+        """Refreshes the report rows of the enrollments losing a grade."""
+        enrollment_ids = self.enrollment_id.ids
+        students = self.student_id
+        res = super().unlink()
+        self.env['university.report']._refresh_rows('id', enrollment_ids)
+        students._mark_academic_record_changed()
+        return res
+
+
+class IrSequence(models.Model):
+    """Sequence extension keeping the cached subject → enrollment sequence mapping consistent."""
+    _inherit = 'ir.sequence'
+
+    def write(self, vals):
+        """Invalidates the mapping when a subject sequence code is renamed."""
+        if 'code' in vals and (self._has_enrollment_sequence() or
+                               (vals['code'] or '').startswith(_ENROLLMENT_SEQUENCE_PREFIX)):
+            self._clear_enrollment_sequence_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        """Invalidates the mapping when a subject sequence is deleted."""
+        if self._has_enrollment_sequence():
+            self._clear_enrollment_sequence_cache()
+        return super().unlink()
+
+    def _has_enrollment_sequence(self) -> bool:
+        """Returns True if any of these sequences numbers enrollments of a subject."""
+        return any((seq.code or '').startswith(_ENROLLMENT_SEQUENCE_PREFIX) for seq in self)
+
+    def _clear_enrollment_sequence_cache(self) -> None:
+        """Clears the ormcache now and again on rollback, so no cached ID outlives its row."""
+        self.env.registry.clear_cache()
+        self.env.cr.postrollback.add(self.env.registry.clear_cache)
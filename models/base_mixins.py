@@ -1,14 +1,77 @@
 import logging
+import threading
 
-from odoo import models
+from psycopg2 import sql as pgsql
+from odoo import api, models, tools, _
+from odoo.exceptions import ValidationError
+from odoo.tools import SQL, split_every
 
 _logger = logging.getLogger(__name__)
 
+_RECOUNT_BATCH_SIZE = 1000
+# Violating records named in a constraint error before the rest is summarized
+_CONSTRAINT_REPORTED_VIOLATORS = 20
+
+# Cursor cache entry holding the public page stamps computed by the current transaction
+_WEBSITE_STAMP_CACHE_KEY = 'university_website_stamps'
+
+# Statement-level trigger body applying the net per-parent delta of a child statement.
+_COUNTER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE {parent} p SET {counter} = COALESCE(p.{counter}, 0) + d.delta
+              FROM (SELECT {column} AS parent_id, COUNT(*) AS delta
+                      FROM new_rows WHERE {column} IS NOT NULL GROUP BY {column}) d
+             WHERE p.id = d.parent_id;
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE {parent} p SET {counter} = COALESCE(p.{counter}, 0) - d.delta
+              FROM (SELECT {column} AS parent_id, COUNT(*) AS delta
+                      FROM old_rows WHERE {column} IS NOT NULL GROUP BY {column}) d
+             WHERE p.id = d.parent_id;
+        ELSE
+            UPDATE {parent} p SET {counter} = COALESCE(p.{counter}, 0) + d.delta
+              FROM (SELECT moves.parent_id, SUM(moves.delta) AS delta
+                      FROM (SELECT n.{column} AS parent_id, 1 AS delta
+                              FROM new_rows n JOIN old_rows o ON o.id = n.id
+                             WHERE n.{column} IS DISTINCT FROM o.{column} AND n.{column} IS NOT NULL
+                            UNION ALL
+                            SELECT o.{column}, -1
+                              FROM new_rows n JOIN old_rows o ON o.id = n.id
+                             WHERE n.{column} IS DISTINCT FROM o.{column} AND o.{column} IS NOT NULL
+                           ) moves
+                     GROUP BY moves.parent_id) d
+             WHERE p.id = d.parent_id AND d.delta <> 0;
+        END IF;
+        RETURN NULL;
+    END;
+    $$
+"""
+
+# PostgreSQL only allows transition tables on single-event triggers
+_COUNTER_TRIGGERS = (
+    ('ins', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('del', 'DELETE', 'OLD TABLE AS old_rows'),
+    ('upd', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+)
+
+
 class BatchCountMixin(models.AbstractModel):
-    """Efficient batch counting mixin for related records. N+1"""
+    """
+    Efficient batch counting mixin for related records. N+1
+
+    Models may opt in to stored counters by listing them in ``_batch_counters``
+    as ``{counter field: (child model, child many2one field)}``. The counter fields must be
+    stored computed fields without dependencies: the compute seeds new records and serves
+    as the recount, while database triggers installed on the child tables apply the
+    deltas of every insert, delete and reassignment. Child models must inherit this mixin
+    so that the ORM cache follows the trigger updates.
+    """
     _name = 'batch.count.mixin'
     _description = 'Batch Count Mixin'
 
+    _batch_counters: dict[str, tuple[str, str]] = {}
+
     def _get_batch_counts(self, model_name: str, field_name: str) -> dict[int, int]:
         """
         Calculates the count of records grouped by a relational field.
@@ -20,11 +83,311 @@ class BatchCountMixin(models.AbstractModel):
         Returns:
             dict[int, int]: Mapping of record IDs to their count.
         """
+        return self._get_batch_counts_multi([(model_name, field_name)])[(model_name, field_name)]
+
+    def _get_batch_counts_multi(self, relations: list[tuple[str, str]]) -> dict[tuple[str, str], dict[int, int]]:
+        """
+        Counts several child relations of these records with a single UNION ALL statement.
+        Each branch is built by the ORM, so access rules still apply to every child model.
+
+        Args:
+            relations (list[tuple[str, str]]): (child model name, relational field) pairs.
+
+        Returns:
+            dict[tuple[str, str], dict[int, int]]: Per pair, mapping of record IDs to their count.
+        """
+        counts = {relation: {} for relation in relations}
+        if not self.ids or not relations:
+            return counts
+
+        branches = []
+        for index, (model_name, field_name) in enumerate(relations):
+            model = self.env[model_name]
+            model.flush_model([field_name])
+            query = model._search([(field_name, 'in', self.ids)])
+            column = SQL.identifier(query.table, field_name)
+            query.order = None
+            query.groupby = column
+            branches.append(SQL("(%s)", query.select(SQL("%s", index), column, SQL("COUNT(*)"))))
+
+        for index, record_id, count in self.env.execute_query(SQL(" UNION ALL ").join(branches)):
+            if record_id:
+                counts[relations[index]][record_id] = count
+        return counts
+
+    # Stored counters: child side
+
+    @api.model
+    @tools.ormcache('child_model')
+    def _get_batch_counter_targets(self, child_model: str) -> tuple[tuple[str, str, str], ...]:
+        """
+        Lists the stored counters fed by a child model.
+
+        Returns:
+            tuple: (parent model, counter field, child many2one field) triples.
+        """
+        targets = []
+        for model_name in self.env.registry:
+            model_cls = self.env.registry[model_name]
+            # Only models inheriting this mixin declare counters
+            counters = getattr(model_cls, '_batch_counters', None)
+            if model_cls._abstract or not counters:
+                continue
+            for counter, (counted_model, field_name) in counters.items():
+                if counted_model == child_model:
+                    targets.append((model_name, counter, field_name))
+        return tuple(targets)
+
+    def init(self) -> None:
+        """Installs the counter triggers on this model's table for every counter it feeds."""
+        super().init()
+        for parent_model, counter, field_name in self._get_batch_counter_targets(self._name):
+            self._install_batch_counter_triggers(parent_model, counter, field_name)
+
+    def _install_batch_counter_triggers(self, parent_model: str, counter: str, field_name: str) -> None:
+        """Creates (or replaces) the trigger function and its statement-level triggers."""
+        parent_table = self.env[parent_model]._table
+        identifiers = {
+            'function': pgsql.Identifier(f'{parent_table}_{counter}_fn'),
+            'parent': pgsql.Identifier(parent_table),
+            'counter': pgsql.Identifier(counter),
+            'column': pgsql.Identifier(field_name),
+        }
+        self.env.cr.execute(pgsql.SQL(_COUNTER_FUNCTION).format(**identifiers))
+        for suffix, event, referencing in _COUNTER_TRIGGERS:
+            trigger = pgsql.Identifier(f'{parent_table}_{counter}_{suffix}')
+            table = pgsql.Identifier(self._table)
+            self.env.cr.execute(pgsql.SQL("DROP TRIGGER IF EXISTS {} ON {}").format(trigger, table))
+            self.env.cr.execute(pgsql.SQL(
+                "CREATE TRIGGER {trigger} AFTER {event} ON {table} "
+                "REFERENCING {referencing} FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+            ).format(
+                trigger=trigger,
+                event=pgsql.SQL(event),
+                table=table,
+                referencing=pgsql.SQL(referencing),
+                function=identifiers['function'],
+            ))
+
+    def _flush_batch_counters(self, targets) -> None:
+        """Writes pending parent counter values before the triggers move them."""
+        for parent_model, counter, _field_name in targets:
+            self.env[parent_model].flush_model([counter])
+
+    def _invalidate_batch_counters(self, targets) -> None:
+        """Drops cached parent counters after the triggers changed them in the database."""
+        for parent_model, counter, _field_name in targets:
+            self.env[parent_model].invalidate_model([counter], flush=False)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        targets = self._get_batch_counter_targets(self._name)
+        if not targets:
+            return super().create(vals_list)
+        self._flush_batch_counters(targets)
+        records = super().create(vals_list)
+        # Related/computed many2ones (e.g. grade.student_id) reach the table on flush
+        records.flush_recordset([field_name for _parent, _counter, field_name in targets])
+        self._invalidate_batch_counters(targets)
+        return records
+
+    def write(self, vals):
+        targets = self._get_batch_counter_targets(self._name)
+        if not targets or not any(
+            field_name in vals or self._fields[field_name].compute
+            for _parent, _counter, field_name in targets
+        ):
+            return super().write(vals)
+        self._flush_batch_counters(targets)
+        res = super().write(vals)
+        self.flush_recordset([field_name for _parent, _counter, field_name in targets])
+        self._invalidate_batch_counters(targets)
+        return res
+
+    def unlink(self):
+        targets = self._get_batch_counter_targets(self._name)
+        if not targets:
+            return super().unlink()
+        self._flush_batch_counters(targets)
+        res = super().unlink()
+        self._invalidate_batch_counters(targets)
+        return res
+
+    # Stored counters: repair
+
+    def _recount_batch_counters(self) -> None:
+        """Recomputes the stored counters of these records from scratch."""
+        fields_to_recount = [self._fields[counter] for counter in self._batch_counters]
+        if not fields_to_recount:
+            return
+        for batch_ids in split_every(_RECOUNT_BATCH_SIZE, self.ids):
+            records = self.browse(batch_ids)
+            for field in fields_to_recount:
+                self.env.add_to_compute(field, records)
+            records.flush_recordset([field.name for field in fields_to_recount])
+            self.env.invalidate_all()
+
+    @api.model
+    def _recount_all_batch_counters(self) -> None:
+        """Repairs every stored counter of every model opting in. Used by the recount cron."""
+        for model_name in self.env.registry:
+            model_cls = self.env.registry[model_name]
+            counters = getattr(model_cls, '_batch_counters', None)
+            if model_cls._abstract or not counters:
+                continue
+            records = self.env[model_name].with_context(active_test=False).search([])
+            records._recount_batch_counters()
+            _logger.info("Recounted %s on %d %s records", ', '.join(counters), len(records), model_name)
+
+
+class WebsiteCacheMixin(models.AbstractModel):
+    """
+    Keeps the stamps of the public /universidad pages consistent with the records they
+    show. Models opting in are expected to expose ``write_date``, which the stamps
+    aggregate together with record counts (see ``university.university._get_website_stamp``).
+
+    A stamp is read from the data itself, so editing a record writes nothing else and
+    concurrent edits never contend on a shared row. It is only kept on the cursor for the
+    rest of the transaction, and dropped as soon as a record of these models changes.
+    """
+    _name = 'university.website.cache.mixin'
+    _description = 'University Website Cache Mixin'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self._invalidate_website_stamps()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self._invalidate_website_stamps()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._invalidate_website_stamps()
+        return res
+
+    @api.model
+    def _get_website_stamps(self) -> dict:
+        """Stamps computed by the current transaction, by page; forgotten when it ends."""
+        cr = self.env.cr
+        if _WEBSITE_STAMP_CACHE_KEY not in cr.cache:
+            cr.postcommit.add(lambda: cr.cache.pop(_WEBSITE_STAMP_CACHE_KEY, None))
+            cr.postrollback.add(lambda: cr.cache.pop(_WEBSITE_STAMP_CACHE_KEY, None))
+        return cr.cache.setdefault(_WEBSITE_STAMP_CACHE_KEY, {})
+
+    @api.model
+    def _invalidate_website_stamps(self) -> None:
+        """Forgets the stamps computed so far: the pages they describe have changed."""
+        self.env.cr.cache.pop(_WEBSITE_STAMP_CACHE_KEY, None)
+
+
+class RankedSearchMixin(models.AbstractModel):
+    """
+    Ranked substring search over the fields listed in ``_ranked_search_fields``.
+
+    Those fields are expected to be declared with ``index='trigram'``: the ``ilike`` filter
+    is then answered by their pg_trgm GIN indexes instead of a sequential scan, and the
+    matches are ordered by trigram similarity to the searched term.
+    """
+    _name = 'university.ranked.search.mixin'
+    _description = 'University Ranked Search Mixin'
+
+    _ranked_search_fields: tuple[str, ...] = ('name',)
+
+    @api.model
+    def _search_ranked(self, term: str, domain: list | None = None, limit: int = 20,
+                       fnames: tuple[str, ...] | None = None) -> models.BaseModel:
+        """
+        Searches the records containing ``term`` in any ranked field, best matches first.
+        Without pg_trgm the matches keep the model's default order.
+
+        Args:
+            term (str): Substring to look for.
+            domain (list | None): Additional domain the matches must satisfy.
+            limit (int): Maximum number of records returned.
+            fnames (tuple[str, ...] | None): Subset of the ranked fields to search, e.g. the
+                ones public visitors may probe; defaults to all of them.
+
+        Returns:
+            models.BaseModel: The matching records, ordered by relevance.
+        """
+        term = (term or '').strip()
+        if not term:
+            return self.browse()
+
+        fnames = fnames or self._ranked_search_fields
+        term_domain = ['|'] * (len(fnames) - 1) + [(fname, 'ilike', term) for fname in fnames]
+        query = self._search(list(domain or []) + term_domain)
+        if self.env.registry.has_trigram:
+            rank = SQL("GREATEST(%s)", SQL(", ").join(
+                SQL("COALESCE(similarity(%s, %s), 0)", self._field_to_sql(query.table, fname, query), term)
+                for fname in fnames
+            ))
+            query.order = SQL("%s DESC, %s", rank, SQL.identifier(query.table, 'id'))
+        query.limit = limit
+        return self.browse(record_id for record_id, in self.env.execute_query(query.select()))
+
+
+class BatchConstraintMixin(models.AbstractModel):
+    """
+    Set-based validation for cross-record constraints: each check runs one SQL query over
+    the whole recordset instead of following relations record by record, and the error
+    names every violating record (up to ``_CONSTRAINT_REPORTED_VIOLATORS``).
+    """
+    _name = 'university.batch.constraint.mixin'
+    _description = 'University Batch Constraint Mixin'
+
+    def _get_constraint_violators(self, query: SQL, model_names: tuple[str, ...] = ()) -> models.BaseModel:
+        """
+        Runs a query returning the IDs of the violating records among these ones.
+
+        Args:
+            query (SQL): Query selecting violator IDs; it should restrict itself to ``self.ids``.
+            model_names (tuple[str, ...]): Other models the query reads, flushed beforehand.
+
+        Returns:
+            models.BaseModel: The violating records.
+        """
         if not self.ids:
-            return {}
+            return self.browse()
+        for model_name in (self._name, *model_names):
+            self.env[model_name].flush_model()
+        return self.browse(record_id for record_id, in self.env.execute_query(query))
 
-        domain = [(field_name, 'in', self.ids)]
-        groups = self.env[model_name]._read_group(domain, [field_name], ['__count'])
-        
-        # We extract the ID from the relational record object (rel_record)
-        return {rel_record.id: count for rel_record, count in groups if rel_record}
\ No newline at end of file
+    def _raise_constraint_violations(self, message: str, describe=None) -> None:
+        """
+        Raises a ValidationError listing these violating records, if any.
+
+        Args:
+            message (str): Translated description of the violated rule.
+            describe (callable | None): Turns a record into its line; defaults to its display name.
+
+        Raises:
+            ValidationError: If there is at least one record.
+        """
+        if not self:
+            return
+        describe = describe or (lambda record: record.display_name)
+        lines = [f"- {describe(record)}" for record in self[:_CONSTRAINT_REPORTED_VIOLATORS]]
+        if len(self) > _CONSTRAINT_REPORTED_VIOLATORS:
+            lines.append(_("... and %s more.", len(self) - _CONSTRAINT_REPORTED_VIOLATORS))
+        raise ValidationError("%s\n%s" % (message, "\n".join(lines)))
+
+
+class ChunkCommitMixin(models.AbstractModel):
+    """
+    Lets long-running crons commit their work chunk by chunk, so that a crash or a
+    timeout only replays the chunk in progress.
+    """
+    _name = 'university.chunk.commit.mixin'
+    _description = 'University Chunk Commit Mixin'
+
+    def _commit_chunk(self) -> None:
+        """Commits a processed chunk and frees its cache. Never commits inside tests."""
+        self.env.flush_all()
+        if not getattr(threading.current_thread(), 'testing', False):
+            self.env.cr.commit()
+        self.env.invalidate_all()
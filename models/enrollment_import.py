@@ -0,0 +1,292 @@
+import csv
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Iterable, Iterator
+
+import psycopg2
+
+from odoo import models, api, _
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
+
+_IMPORT_CHUNK_SIZE = 1000
+
+
+class EnrollmentImport(models.AbstractModel):
+    """
+    Streaming bulk enrollment loader.
+
+    Rows are dictionaries referencing the student by ``student_email`` or ``student_id``,
+    the subject by ``subject_code`` or ``subject_id`` and, optionally, the professor by
+    ``professor_email`` or ``professor_id``. ``university_id`` and ``code`` are optional.
+    """
+    _name = 'university.enrollment.import'
+    _description = 'Enrollment Bulk Import'
+
+    @api.model
+    def import_enrollments(
+        self,
+        source: str | Iterable[dict[str, Any]],
+        university_id: int | None = None,
+        chunk_size: int = _IMPORT_CHUNK_SIZE,
+        file_format: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Streams enrollment rows in bounded chunks, resolving and validating each chunk as a set.
+        Invalid rows are reported instead of aborting the whole load.
+
+        Args:
+            source (str | Iterable[dict]): Path of a CSV/JSONL file, an open text file, or an iterable of rows.
+            university_id (int | None): Restricts the whole load to one university.
+            chunk_size (int): Number of rows resolved and inserted per round.
+            file_format (str | None): 'csv' or 'jsonl' for file objects; inferred from the path extension otherwise.
+
+        Returns:
+            dict[str, Any]: {'created': int, 'errors': [{'row': int, 'error': str}, ...]}
+        """
+        created = 0
+        errors: list[dict[str, Any]] = []
+
+        for chunk in split_every(chunk_size, enumerate(self._iter_rows(source, file_format), start=1)):
+            vals_by_row, chunk_errors = self._prepare_chunk(chunk, university_id)
+            errors.extend(chunk_errors)
+            chunk_created, insert_errors = self._create_chunk(vals_by_row)
+            created += chunk_created
+            errors.extend(insert_errors)
+            # Keep memory bounded whatever the size of the load
+            self.env.invalidate_all()
+
+        _logger.info("Enrollment import finished: %d created, %d rejected", created, len(errors))
+        return {
+            'created': created,
+            'errors': sorted(errors, key=lambda error: error['row']),
+        }
+
+    @api.model
+    def _iter_rows(self, source: Any, file_format: str | None = None) -> Iterator[dict[str, Any]]:
+        """Yields row dictionaries lazily from a path, a text file object or an iterable."""
+        if isinstance(source, (str, os.PathLike)):
+            file_format = file_format or os.path.splitext(os.fspath(source))[1].lstrip('.').lower()
+            with open(source, newline='', encoding='utf-8') as stream:
+                yield from self._iter_stream(stream, file_format)
+        elif hasattr(source, 'read'):
+            yield from self._iter_stream(source, file_format or 'csv')
+        else:
+            yield from source
+
+    @api.model
+    def _iter_stream(self, stream: Any, file_format: str) -> Iterator[dict[str, Any]]:
+        """
+        Parses an open text stream as CSV (with header) or JSON Lines. A line that is not
+        valid JSON is yielded as a ValueError naming its line, reported like any invalid row.
+        """
+        if file_format == 'csv':
+            yield from csv.DictReader(stream)
+        elif file_format in ('jsonl', 'ndjson'):
+            for line_number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as error:
+                    yield ValueError(_("Line %(line)s is not valid JSON: %(error)s", line=line_number, error=error.msg))
+        else:
+            raise UserError(_("Unsupported enrollment import format '%s'. Use CSV or JSONL.", file_format))
+
+    @api.model
+    def _prepare_chunk(
+        self, chunk: tuple[tuple[int, dict[str, Any]], ...], university_id: int | None,
+    ) -> tuple[dict[int, dict[str, Any]], list[dict[str, Any]]]:
+        """
+        Resolves every reference of the chunk with one query per model and validates
+        the rows against the enrollment constraints as a set.
+
+        Returns:
+            tuple: ({row_number: create vals}, [error dicts])
+        """
+        errors: list[dict[str, Any]] = []
+        rows = []
+        for row_number, row in chunk:
+            if isinstance(row, ValueError):
+                errors.append({'row': row_number, 'error': str(row)})
+            elif not isinstance(row, dict):
+                errors.append({'row': row_number, 'error': _("The row is not an object of named fields.")})
+            else:
+                rows.append((row_number, row))
+        chunk = rows
+
+        student_emails, student_ids = set(), set()
+        subject_codes, subject_ids = set(), set()
+        professor_emails, professor_ids = set(), set()
+        for _row_number, row in chunk:
+            _collect_reference(row, 'student_email', 'student_id', student_emails, student_ids)
+            _collect_reference(row, 'subject_code', 'subject_id', subject_codes, subject_ids)
+            _collect_reference(row, 'professor_email', 'professor_id', professor_emails, professor_ids)
+
+        students = self.env['university.student'].search_fetch(
+            ['|', ('email', 'in', list(student_emails)), ('id', 'in', list(student_ids))],
+            ['email', 'university_id'],
+        )
+        subjects = self.env['university.subject'].search_fetch(
+            ['|', ('code', 'in', list(subject_codes)), ('id', 'in', list(subject_ids))],
+            ['code', 'university_id', 'professor_ids'],
+        )
+        professors = self.env['university.professor'].search_fetch(
+            ['|', ('email', 'in', list(professor_emails)), ('id', 'in', list(professor_ids))],
+            ['email', 'university_id'],
+        )
+
+        student_by_id = {student.id: student for student in students}
+        student_by_email = {student.email: student for student in students}
+        subject_by_id = {subject.id: subject for subject in subjects}
+        subjects_by_code = defaultdict(list)
+        for subject in subjects:
+            subjects_by_code[(subject.university_id.id, subject.code)].append(subject)
+        professor_by_id = {professor.id: professor for professor in professors}
+        professors_by_email = defaultdict(list)
+        for professor in professors:
+            professors_by_email[(professor.university_id.id, professor.email)].append(professor)
+        teaching = {(professor.id, subject.id) for subject in subjects for professor in subject.professor_ids}
+
+        existing_pairs = {
+            (enrollment.student_id.id, enrollment.subject_id.id)
+            for enrollment in self.env['university.enrollment'].search_fetch(
+                [('student_id', 'in', students.ids), ('subject_id', 'in', subjects.ids)],
+                ['student_id', 'subject_id'],
+            )
+        }
+
+        vals_by_row: dict[int, dict[str, Any]] = {}
+        for row_number, row in chunk:
+            try:
+                vals = self._validate_row(
+                    row, university_id, student_by_id, student_by_email, subject_by_id,
+                    subjects_by_code, professor_by_id, professors_by_email, teaching,
+                )
+            except UserError as error:
+                errors.append({'row': row_number, 'error': str(error)})
+                continue
+
+            pair = (vals['student_id'], vals['subject_id'])
+            if pair in existing_pairs:
+                errors.append({'row': row_number, 'error': _("The student is already enrolled in this subject.")})
+                continue
+            existing_pairs.add(pair)
+            vals_by_row[row_number] = vals
+        return vals_by_row, errors
+
+    @api.model
+    def _validate_row(
+        self, row, university_id, student_by_id, student_by_email, subject_by_id,
+        subjects_by_code, professor_by_id, professors_by_email, teaching,
+    ) -> dict[str, Any]:
+        """
+        Turns one raw row into enrollment create values using the pre-resolved lookups.
+
+        Raises:
+            UserError: If a reference is unknown or violates an enrollment constraint.
+        """
+        student = (
+            student_by_id.get(_to_int(row.get('student_id')))
+            or student_by_email.get(str(row.get('student_email') or '').strip())
+        )
+        if not student:
+            raise UserError(_("Unknown student."))
+
+        university = _to_int(row.get('university_id')) or university_id or student.university_id.id
+        if university_id and university != university_id:
+            raise UserError(_("The enrollment must belong to the university being imported."))
+        if student.university_id.id != university:
+            raise UserError(_("The student must belong to the same university as the enrollment."))
+
+        subject = subject_by_id.get(_to_int(row.get('subject_id')))
+        if not subject:
+            candidates = subjects_by_code.get((university, str(row.get('subject_code') or '').strip()), [])
+            if len(candidates) > 1:
+                raise UserError(_("Subject code '%s' is ambiguous in this university.", row.get('subject_code')))
+            subject = candidates[0] if candidates else None
+        if not subject:
+            raise UserError(_("Unknown subject."))
+        if subject.university_id.id != university:
+            raise UserError(_("The subject must belong to the same university as the enrollment."))
+
+        vals = {
+            'student_id': student.id,
+            'subject_id': subject.id,
+            'university_id': university,
+        }
+        if row.get('code'):
+            vals['code'] = row['code']
+
+        if row.get('professor_id') or row.get('professor_email'):
+            professor = professor_by_id.get(_to_int(row.get('professor_id')))
+            if not professor:
+                candidates = professors_by_email.get((university, str(row.get('professor_email') or '').strip()), [])
+                if len(candidates) > 1:
+                    raise UserError(_("Professor email '%s' is ambiguous in this university.", row.get('professor_email')))
+                professor = candidates[0] if candidates else None
+            if not professor:
+                raise UserError(_("Unknown professor."))
+            if professor.university_id.id != university:
+                raise UserError(_("The professor must belong to the same university as the enrollment."))
+            if (professor.id, subject.id) not in teaching:
+                raise UserError(_(
+                    "Professor '%(professor)s' does not teach '%(subject)s'. "
+                    "Only professors assigned to the subject can be selected.",
+                    professor=professor.name,
+                    subject=subject.name,
+                ))
+            vals['professor_id'] = professor.id
+        return vals
+
+    @api.model
+    def _create_chunk(self, vals_by_row: dict[int, dict[str, Any]]) -> tuple[int, list[dict[str, Any]]]:
+        """
+        Inserts a validated chunk with one batched create. If the database still rejects it
+        (e.g. a concurrent enrollment), rows are retried one by one to isolate the culprits.
+
+        Returns:
+            tuple: (number of created enrollments, [error dicts])
+        """
+        if not vals_by_row:
+            return 0, []
+
+        Enrollment = self.env['university.enrollment']
+        try:
+            with self.env.cr.savepoint():
+                Enrollment.create(list(vals_by_row.values()))
+            return len(vals_by_row), []
+        except (UserError, psycopg2.Error):
+            _logger.info("Enrollment import chunk rejected, retrying %d rows individually", len(vals_by_row))
+
+        created = 0
+        errors = []
+        for row_number, vals in vals_by_row.items():
+            try:
+                with self.env.cr.savepoint():
+                    Enrollment.create(vals)
+                created += 1
+            except (UserError, psycopg2.Error) as error:
+                errors.append({'row': row_number, 'error': str(error)})
+        return created, errors
+
+
+def _collect_reference(row: dict[str, Any], key_field: str, id_field: str, keys: set, ids: set) -> None:
+    """Adds the natural key or database id referenced by a row to the lookup sets."""
+    record_id = _to_int(row.get(id_field))
+    if record_id:
+        ids.add(record_id)
+    elif row.get(key_field):
+        keys.add(str(row[key_field]).strip())
+
+
+def _to_int(value: Any) -> int | None:
+    """Parses an optional integer coming from CSV text, JSON or Python."""
+    try:
+        return int(value) if value not in (None, '', False) else None
+    except (TypeError, ValueError):
+        return None
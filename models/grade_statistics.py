@@ -0,0 +1,280 @@
+import logging
+from collections import defaultdict
+from itertools import groupby
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_logger = logging.getLogger(__name__)
+
+# One row per change of the grades since the statistics were last computed. Writers only
+# insert, so concurrent grading never contends on a shared row; the refresh deletes the
+# rows its snapshot saw. Not a system parameter: writing one clears every worker's caches.
+_STALE_TABLE = 'university_grade_statistics_stale'
+_PASS_SCORE = 5.0
+# Upper bounds of the histogram buckets; the last bucket also holds the maximum score
+_HISTOGRAM_EDGES = (2.0, 4.0, 6.0, 8.0)
+_BUCKET_FIELDS = ('bucket_0_2', 'bucket_2_4', 'bucket_4_6', 'bucket_6_8', 'bucket_8_10')
+_PERCENTILES = {'score_p25': 0.25, 'score_median': 0.5, 'score_p75': 0.75, 'score_p90': 0.9}
+_STAT_FIELDS = (
+    'grade_count', 'score_mean', 'score_std', 'score_min', 'score_max', 'pass_rate',
+    *_PERCENTILES, *_BUCKET_FIELDS,
+)
+_INTEGER_FIELDS = {'university_id', 'department_id', 'subject_id', 'professor_id', 'grade_count', *_BUCKET_FIELDS}
+
+# Dimension: (column of the statistics table, SQL grouping key, SQL university of the group)
+_DIMENSIONS = {
+    'university': ('university_id', 'e.university_id', 'e.university_id'),
+    'department': ('department_id', 'sub.department_id', 'sub.university_id'),
+    'subject': ('subject_id', 'e.subject_id', 'sub.university_id'),
+    'professor': ('professor_id', 'e.professor_id', 'p.university_id'),
+}
+
+# Scores sorted by group, then by score: each group is a contiguous, sorted run
+_SCORES_QUERY = """
+    SELECT {key} AS group_id, {university} AS university_id, g.score
+      FROM university_grade g
+      JOIN university_enrollment e ON e.id = g.enrollment_id
+      JOIN university_subject sub ON sub.id = e.subject_id
+      LEFT JOIN university_professor p ON p.id = e.professor_id
+     WHERE g.score IS NOT NULL AND {key} IS NOT NULL
+     ORDER BY 1, 3
+"""
+
+
+class GradeStatistics(models.Model):
+    """
+    Grade distribution per university, department, subject and professor (Read-only).
+
+    Rows are computed in bulk from the grade scores, vectorized with NumPy when it is
+    installed, by the refresh cron: nightly, and on demand when the analysis is opened
+    while the grades moved since the last computation. Requests only read stored rows.
+    """
+    _name = 'university.grade.statistics'
+    _description = 'Grade Statistics'
+    _order = 'dimension, university_id, id'
+
+    dimension = fields.Selection(
+        selection=[
+            ('university', 'University'),
+            ('department', 'Department'),
+            ('subject', 'Subject'),
+            ('professor', 'Professor'),
+        ],
+        string='Dimension',
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    university_id = fields.Many2one('university.university', string='University', readonly=True, index=True, ondelete='cascade')
+    department_id = fields.Many2one('university.department', string='Department', readonly=True, ondelete='cascade')
+    subject_id = fields.Many2one('university.subject', string='Subject', readonly=True, ondelete='cascade')
+    professor_id = fields.Many2one('university.professor', string='Professor', readonly=True, ondelete='cascade')
+
+    grade_count = fields.Integer(string='Grades', readonly=True, aggregator='sum')
+    score_mean = fields.Float(string='Mean', readonly=True, aggregator='avg')
+    score_median = fields.Float(string='Median', readonly=True, aggregator='avg')
+    score_p25 = fields.Float(string='25th Percentile', readonly=True, aggregator='avg')
+    score_p75 = fields.Float(string='75th Percentile', readonly=True, aggregator='avg')
+    score_p90 = fields.Float(string='90th Percentile', readonly=True, aggregator='avg')
+    score_std = fields.Float(string='Standard Deviation', readonly=True, aggregator='avg')
+    score_min = fields.Float(string='Lowest Score', readonly=True, aggregator='min')
+    score_max = fields.Float(string='Highest Score', readonly=True, aggregator='max')
+    pass_rate = fields.Float(string='Pass Rate (%)', readonly=True, aggregator='avg')
+    bucket_0_2 = fields.Integer(string='Scores 0-2', readonly=True, aggregator='sum')
+    bucket_2_4 = fields.Integer(string='Scores 2-4', readonly=True, aggregator='sum')
+    bucket_4_6 = fields.Integer(string='Scores 4-6', readonly=True, aggregator='sum')
+    bucket_6_8 = fields.Integer(string='Scores 6-8', readonly=True, aggregator='sum')
+    bucket_8_10 = fields.Integer(string='Scores 8-10', readonly=True, aggregator='sum')
+
+    @api.depends('dimension', 'university_id', 'department_id', 'subject_id', 'professor_id')
+    def _compute_display_name(self) -> None:
+        """Names each row after the group it describes."""
+        for record in self:
+            group = record[_DIMENSIONS[record.dimension][0]] if record.dimension else False
+            record.display_name = group.display_name if group else ''
+
+    def init(self) -> None:
+        """Creates the table of staleness markers, stale after an update of the module."""
+        super().init()
+        self.env.cr.execute(SQL(
+            """
+            CREATE TABLE IF NOT EXISTS %(table)s (id serial PRIMARY KEY);
+            INSERT INTO %(table)s DEFAULT VALUES;
+            """,
+            table=SQL.identifier(_STALE_TABLE),
+        ))
+
+    @api.model
+    def _mark_stale(self) -> None:
+        """Called by the grade and enrollment write paths: the statistics no longer match."""
+        self.env.cr.execute(SQL("INSERT INTO %s DEFAULT VALUES", SQL.identifier(_STALE_TABLE)))
+
+    @api.model
+    def _is_stale(self) -> bool:
+        """Whether the grades changed since the statistics were computed."""
+        self.env.cr.execute(SQL("SELECT EXISTS(SELECT 1 FROM %s)", SQL.identifier(_STALE_TABLE)))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _refresh_if_stale(self) -> bool:
+        """
+        Recomputes the statistics if the grades changed since they were computed.
+
+        Returns:
+            bool: True if they were recomputed.
+        """
+        if not self._is_stale():
+            return False
+        self._cron_refresh_statistics()
+        return True
+
+    @api.model
+    def _refresh_statistics(self) -> None:
+        """Recomputes every statistics row, one bulk query and one bulk insert per dimension."""
+        for model_name in ('university.grade', 'university.enrollment', 'university.subject', 'university.professor'):
+            self.env[model_name].flush_model()
+        self.env.cr.execute(SQL("DELETE FROM %s", SQL.identifier(self._table)))
+        for dimension in _DIMENSIONS:
+            columns = self._compute_dimension(dimension)
+            self._insert_rows(dimension, columns)
+            _logger.info("Computed grade statistics of %d %s groups", len(columns['group_id']), dimension)
+        self.invalidate_model()
+
+    @api.model
+    def _compute_dimension(self, dimension: str) -> dict[str, list]:
+        """
+        Pulls the scores of a dimension in bulk and summarizes every group at once.
+
+        Returns:
+            dict[str, list]: Column name to one value per group, plus ``group_id``.
+        """
+        _column, key, university = _DIMENSIONS[dimension]
+        self.env.cr.execute(_SCORES_QUERY.format(key=key, university=university))
+        rows = self.env.cr.fetchall()
+        if np is not None:
+            return _summarize_numpy(rows)
+        return _summarize_python(rows)
+
+    @api.model
+    def _insert_rows(self, dimension: str, columns: dict[str, list]) -> None:
+        """Inserts the summarized groups of a dimension with a single statement."""
+        if not columns['group_id']:
+            return
+        group_column = _DIMENSIONS[dimension][0]
+        values = {'university_id': columns['university_id'], group_column: columns['group_id']}
+        values.update((fname, columns[fname]) for fname in _STAT_FIELDS)
+        names = SQL(", ").join(SQL.identifier(name) for name in values)
+        arrays = SQL(", ").join(
+            SQL("%s::int[]" if name in _INTEGER_FIELDS else "%s::float8[]", column)
+            for name, column in values.items()
+        )
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO %(table)s (dimension, %(names)s, create_uid, create_date, write_uid, write_date)
+            SELECT %(dimension)s, %(names)s, %(uid)s, %(now)s, %(uid)s, %(now)s
+              FROM unnest(%(arrays)s) AS v(%(names)s)
+            """,
+            table=SQL.identifier(self._table),
+            names=names,
+            arrays=arrays,
+            dimension=dimension,
+            uid=self.env.uid,
+            now=self.env.cr.now(),
+        ))
+
+    @api.model
+    def action_open_statistics(self) -> dict:
+        """
+        Opens the analysis on the stored statistics. If the grades moved since they were
+        computed, the refresh cron is woken up instead of recomputing in the request.
+        """
+        if self._is_stale():
+            # sudo(): scheduling a cron trigger is restricted to administrators
+            self.env.ref('university.ir_cron_refresh_grade_statistics').sudo()._trigger()
+        return self.env['ir.actions.act_window']._for_xml_id('university.action_university_grade_statistics')
+
+    @api.model
+    def _cron_refresh_statistics(self) -> None:
+        """
+        Full recomputation, nightly and whenever the analysis is opened on stale statistics.
+        Running unconditionally also catches changes made outside the marked write paths
+        (e.g. a department moving to another university). Only the markers this
+        transaction can see are cleared: changes committed meanwhile keep it stale.
+        """
+        self._refresh_statistics()
+        self.env.cr.execute(SQL("DELETE FROM %s", SQL.identifier(_STALE_TABLE)))
+
+
+def _summarize_numpy(rows: list[tuple]) -> dict[str, list]:
+    """
+    Vectorized summary of (group_id, university_id, score) rows sorted by group then score:
+    every statistic is computed for all groups at once from the group boundaries.
+    """
+    if not rows:
+        return defaultdict(list)
+    data = np.array(rows, dtype=float)
+    group_ids, university_ids, scores = data[:, 0], data[:, 1], data[:, 2]
+    keys, starts, counts = np.unique(group_ids, return_index=True, return_counts=True)
+    ends = starts + counts - 1
+
+    mean = np.add.reduceat(scores, starts) / counts
+    variance = np.add.reduceat(scores * scores, starts) / counts - mean * mean
+    passed = np.add.reduceat((scores >= _PASS_SCORE).astype(float), starts)
+    columns = {
+        'group_id': keys.astype(int),
+        'university_id': university_ids[starts].astype(int),
+        'grade_count': counts,
+        'score_mean': mean,
+        'score_std': np.sqrt(np.maximum(variance, 0.0)),
+        'score_min': scores[starts],
+        'score_max': scores[ends],
+        'pass_rate': 100.0 * passed / counts,
+    }
+    for fname, fraction in _PERCENTILES.items():
+        # Linear interpolation between the closest ranks, as numpy.percentile does
+        position = starts + fraction * (counts - 1)
+        lower = np.floor(position).astype(int)
+        upper = np.ceil(position).astype(int)
+        columns[fname] = scores[lower] + (scores[upper] - scores[lower]) * (position - lower)
+
+    histogram = np.zeros((len(keys), len(_BUCKET_FIELDS)), dtype=int)
+    group_index = np.repeat(np.arange(len(keys)), counts)
+    np.add.at(histogram, (group_index, np.searchsorted(_HISTOGRAM_EDGES, scores, side='right')), 1)
+    for index, fname in enumerate(_BUCKET_FIELDS):
+        columns[fname] = histogram[:, index]
+    return {fname: values.tolist() for fname, values in columns.items()}
+
+
+def _summarize_python(rows: list[tuple]) -> dict[str, list]:
+    """Same summary as ``_summarize_numpy``, group by group, for servers without NumPy."""
+    columns = defaultdict(list)
+    for group_id, group_rows in groupby(rows, key=lambda row: row[0]):
+        group_rows = list(group_rows)
+        scores = [row[2] for row in group_rows]
+        count = len(scores)
+        mean = sum(scores) / count
+        columns['group_id'].append(group_id)
+        columns['university_id'].append(group_rows[0][1])
+        columns['grade_count'].append(count)
+        columns['score_mean'].append(mean)
+        columns['score_std'].append(max(sum(score * score for score in scores) / count - mean * mean, 0.0) ** 0.5)
+        columns['score_min'].append(scores[0])
+        columns['score_max'].append(scores[-1])
+        columns['pass_rate'].append(100.0 * sum(1 for score in scores if score >= _PASS_SCORE) / count)
+        for fname, fraction in _PERCENTILES.items():
+            position = fraction * (count - 1)
+            lower = int(position)
+            upper = min(lower + 1, count - 1)
+            columns[fname].append(scores[lower] + (scores[upper] - scores[lower]) * (position - lower))
+        buckets = [0] * len(_BUCKET_FIELDS)
+        for score in scores:
+            buckets[sum(1 for edge in _HISTOGRAM_EDGES if score >= edge)] += 1
+        for fname, bucket in zip(_BUCKET_FIELDS, buckets):
+            columns[fname].append(bucket)
+    return columns
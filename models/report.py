@@ -1,13 +1,51 @@
 import logging
 
 from psycopg2 import sql as pgsql
-from odoo import models, fields, tools
+from odoo import models, fields, api, tools
+from odoo.tools import str2bool
+from odoo.tools.sql import TableKind, create_index, table_kind
 
 _logger = logging.getLogger(__name__)
 
+# ir.config_parameter toggling the materialized backing store
+_MATERIALIZED_PARAM = 'university.report_materialized'
+
+# Report columns that can drive an incremental refresh; each one is also an
+# enrollment column, which is what the refresh query filters on.
+_REFRESH_COLUMNS = ('id', 'student_id', 'professor_id')
+
+_REPORT_QUERY = """
+    SELECT
+        e.id                AS id,
+        u.id                AS university_id,
+        p.id                AS professor_id,
+        d.id                AS department_id,
+        s.id                AS student_id,
+        sub.id              AS subject_id,
+        AVG(g.score)        AS score
+    FROM university_enrollment e
+    JOIN  university_student    s   ON s.id   = e.student_id
+    JOIN  university_university u   ON u.id   = s.university_id
+    JOIN  university_subject    sub ON sub.id = e.subject_id
+    LEFT JOIN university_grade      g   ON g.enrollment_id = e.id
+    LEFT JOIN university_professor  p   ON p.id = e.professor_id
+    LEFT JOIN university_department d   ON d.id = p.department_id
+    {where}
+    GROUP BY e.id, u.id, p.id, d.id, s.id, sub.id
+"""
+
+# Columns the pivot/graph views group and filter on
+_INDEXED_COLUMNS = ('university_id', 'professor_id', 'department_id', 'student_id', 'subject_id')
+
 
 class UniversityReport(models.Model):
-    """Aggregated SQL view of student performance (Read-only)."""
+    """
+    Aggregated student performance (Read-only).
+
+    Backed by a plain SQL view by default. When the ``university.report_materialized``
+    system parameter is enabled, rows are stored in an indexed table instead, kept in
+    sync incrementally by grade/enrollment writes and fully rebuilt by cron.
+    """
     _name = 'university.report'
     _description = 'University Report'
     _auto = False  # no table
@@ -45,25 +83,134 @@ class UniversityReport(models.Model):
     )
 
     def init(self) -> None:
-        """Initializes (or replaces) the SQL view backing this read-only report model."""
-        tools.drop_view_if_exists(self.env.cr, self._table)
-        self.env.cr.execute(pgsql.SQL("""
-            CREATE OR REPLACE VIEW {} AS (
-                SELECT
-                    e.id                AS id,
-                    u.id                AS university_id,
-                    p.id                AS professor_id,
-                    d.id                AS department_id,
-                    s.id                AS student_id,
-                    sub.id              AS subject_id,
-                    AVG(g.score)        AS score
-                FROM university_enrollment e
-                JOIN  university_student    s   ON s.id   = e.student_id
-                JOIN  university_university u   ON u.id   = s.university_id
-                JOIN  university_subject    sub ON sub.id = e.subject_id
-                LEFT JOIN university_grade      g   ON g.enrollment_id = e.id
-                LEFT JOIN university_professor  p   ON p.id = e.professor_id
-                LEFT JOIN university_department d   ON d.id = p.department_id
-                GROUP BY e.id, u.id, p.id, d.id, s.id, sub.id
-            )
-        """).format(pgsql.Identifier(self._table)))
+        """Initializes (or replaces) the SQL view or table backing this read-only report model."""
+        self._rebuild_backing_store()
+
+    @api.model
+    def _is_materialized(self) -> bool:
+        """Returns True when the configuration asks for the materialized table."""
+        # sudo(): system parameters are not readable by regular users
+        return str2bool(self.env['ir.config_parameter'].sudo().get_param(_MATERIALIZED_PARAM, 'False'))
+
+    @api.model
+    def _rebuild_backing_store(self) -> None:
+        """
+        Drops the current backing relation and recreates it according to the configured mode:
+        a plain view, or a table with a primary key, the pivot indexes and a cascading
+        foreign key on the enrollment so that deleted enrollments vanish from the report.
+        """
+        cr = self.env.cr
+        kind = table_kind(cr, self._table)
+        if kind == TableKind.View:
+            tools.drop_view_if_exists(cr, self._table)
+        elif kind == TableKind.Regular:
+            cr.execute(pgsql.SQL("DROP TABLE {}").format(pgsql.Identifier(self._table)))
+
+        query = pgsql.SQL(_REPORT_QUERY.format(where=''))
+        if not self._is_materialized():
+            cr.execute(pgsql.SQL("CREATE OR REPLACE VIEW {} AS ({})").format(
+                pgsql.Identifier(self._table), query,
+            ))
+            return
+
+        cr.execute(pgsql.SQL("CREATE TABLE {} AS ({})").format(pgsql.Identifier(self._table), query))
+        cr.execute(pgsql.SQL("""
+            ALTER TABLE {table}
+                ADD PRIMARY KEY (id),
+                ADD FOREIGN KEY (id) REFERENCES university_enrollment (id) ON DELETE CASCADE
+        """).format(table=pgsql.Identifier(self._table)))
+        for column in _INDEXED_COLUMNS:
+            create_index(cr, f'{self._table}_{column}_index', self._table, [column])
+        _logger.info("University report materialized into table %s", self._table)
+
+    @api.model
+    def _refresh_full(self) -> None:
+        """
+        Recomputes every report row. Switches the backing relation first if the
+        configured mode no longer matches it. Used by the nightly cron and the manual action.
+        """
+        self.env.flush_all()
+        expected_kind = TableKind.Regular if self._is_materialized() else TableKind.View
+        if table_kind(self.env.cr, self._table) != expected_kind:
+            self._rebuild_backing_store()
+        elif expected_kind == TableKind.Regular:
+            # DELETE rather than TRUNCATE: readers keep seeing the old rows until commit
+            self.env.cr.execute(pgsql.SQL("DELETE FROM {}").format(pgsql.Identifier(self._table)))
+            self.env.cr.execute(pgsql.SQL("INSERT INTO {} {}").format(
+                pgsql.Identifier(self._table), pgsql.SQL(_REPORT_QUERY.format(where='')),
+            ))
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_rows(self, column: str, ids: list[int]) -> None:
+        """
+        Incrementally recomputes the report rows matching the given ids.
+        No-op when the report is served from the plain view. The actual relation decides,
+        not the parameter: they only differ until the backing store is rebuilt.
+
+        Args:
+            column (str): Report column to match, one of 'id' (enrollment), 'student_id' or 'professor_id'.
+            ids (list[int]): Values of that column whose rows must be recomputed.
+        """
+        assert column in _REFRESH_COLUMNS, f"Cannot refresh report rows by {column!r}"
+        ids = [record_id for record_id in set(ids) if record_id]
+        if not ids or table_kind(self.env.cr, self._table) != TableKind.Regular:
+            return
+
+        for model_name in ('university.enrollment', 'university.grade', 'university.student',
+                           'university.professor'):
+            self.env[model_name].flush_model()
+
+        self.env.cr.execute(
+            pgsql.SQL("DELETE FROM {} WHERE {} = ANY(%s)").format(
+                pgsql.Identifier(self._table), pgsql.Identifier(column),
+            ),
+            [ids],
+        )
+        self.env.cr.execute(
+            pgsql.SQL("INSERT INTO {} {}").format(
+                pgsql.Identifier(self._table),
+                pgsql.SQL(_REPORT_QUERY.format(where=f'WHERE e.{column} = ANY(%s)')),
+            ),
+            [ids],
+        )
+        self.invalidate_model()
+
+    @api.model
+    def action_refresh(self) -> dict:
+        """Manually rebuilds the report and reopens it."""
+        self._refresh_full()
+        return self.env['ir.actions.act_window']._for_xml_id('university.action_university_report')
+
+    @api.model
+    def _cron_refresh_report(self) -> None:
+        """Nightly full refresh reconciling any drift of the materialized rows (or a mode switch)."""
+        self._refresh_full()
+
+
+class IrConfigParameter(models.Model):
+    """Rebuilds the report backing store as soon as its mode parameter changes."""
+    _inherit = 'ir.config_parameter'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Switches the report backing store when the mode parameter is created."""
+        params = super().create(vals_list)
+        if any(vals.get('key') == _MATERIALIZED_PARAM for vals in vals_list):
+            self.env['university.report']._refresh_full()
+        return params
+
+    def write(self, vals):
+        """Switches the report backing store when the mode parameter changes."""
+        res = super().write(vals)
+        if _MATERIALIZED_PARAM in self.mapped('key'):
+            self.env['university.report']._refresh_full()
+        return res
+
+    def unlink(self):
+        """Falls back to the plain view when the mode parameter is removed."""
+        removed = _MATERIALIZED_PARAM in self.mapped('key')
+        res = super().unlink()
+        if removed:
+            self.env['university.report']._refresh_full()
+        return res
@@ -1,5 +1,15 @@
+import io
+import logging
+import threading
+
 from odoo import models, api
 
+_logger = logging.getLogger(__name__)
+
+# Context key carrying {student id: PDF bytes} rendered ahead by a batch call
+_PRERENDERED_CONTEXT_KEY = 'university_report_pdfs'
+_STUDENT_REPORT_NAME = 'university.report_student_template'
+
 
 class StudentReportParser(models.AbstractModel):
     """Parser to inject computed data into the students report QWeb."""
@@ -9,34 +19,86 @@ class StudentReportParser(models.AbstractModel):
     @api.model
     def _get_report_values(self, docids, data=None):
         docs = self.env['university.student'].browse(docids)
-
-        # Prefetch the full grade → enrollment → subject/professor chain for Section 2
-        # to avoid N+1 queries when the QWeb template iterates o.grade_ids.
-        docs.mapped('grade_ids.enrollment_id.subject_id')
-        docs.mapped('grade_ids.enrollment_id.professor_id')
-
-        groups = self.env['university.grade']._read_group(
-            domain=[('student_id', 'in', docids)],
-            groupby=['student_id', 'enrollment_id'],
-            aggregates=['score:avg']
-        )
-
-        # Prefetch subject_id and professor_id in batch before iteration to avoid N+1 queries
-        enrollment_ids = [enrollment.id for _, enrollment, _ in groups]
-        if enrollment_ids:
-            prefetched = self.env['university.enrollment'].browse(enrollment_ids)
-            prefetched.mapped('subject_id.name')
-            prefetched.mapped('professor_id.name')
-
-        summary_by_student = {doc_id: [] for doc_id in docids}
-        for student, enrollment, avg_score in groups:
-            summary_by_student[student.id].append({
-                'subject': enrollment.subject_id.name,
-                'professor': enrollment.professor_id.name or 'N/A',
-                'average': avg_score or 0.0
-            })
+        # The transcript loader reads with raw SQL: enforce the access to the students first
+        docs.check_access('read')
 
         return {
             'docs': docs,
-            'student_summaries': summary_by_student,
+            'transcripts': docs._get_transcript_data(),
+        }
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _render_qweb_pdf_prepare_streams(self, report_ref, data, res_ids=None):
+        """
+        Serves student reports without rendering them when possible: from the batch
+        rendered ahead by ``_render_student_report_pdfs`` (context), or from the student's
+        PDF cache while its fingerprint matches. Anything rendered is cached for next time.
+        """
+        if (
+            not res_ids
+            or self._get_report(report_ref).report_name != _STUDENT_REPORT_NAME
+            or set(data or {}) - {'report_type'}
+        ):
+            return super()._render_qweb_pdf_prepare_streams(report_ref, data, res_ids=res_ids)
+
+        students = self.env['university.student'].browse(res_ids)
+        fingerprints = students._get_report_fingerprints()
+        cached = students._get_cached_report_pdfs(fingerprints)
+        pdfs = {**cached, **(self.env.context.get(_PRERENDERED_CONTEXT_KEY) or {})}
+
+        missing_ids = [res_id for res_id in res_ids if res_id not in pdfs]
+        rendered = super()._render_qweb_pdf_prepare_streams(report_ref, data, res_ids=missing_ids) if missing_ids else {}
+        fresh = {res_id: pdfs[res_id] for res_id in res_ids if res_id in pdfs and res_id not in cached}
+        fresh.update({
+            res_id: stream_data['stream'].getvalue()
+            for res_id, stream_data in rendered.items()
+            if res_id and stream_data.get('stream')
+        })
+        students._store_report_pdfs(fresh, fingerprints)
+
+        streams = {
+            res_id: (
+                {'stream': io.BytesIO(pdfs[res_id]), 'attachment': None}
+                if res_id in pdfs else rendered.pop(res_id)
+            )
+            for res_id in res_ids if res_id in pdfs or res_id in rendered
         }
+        streams.update(rendered)
+        return streams
+
+    @api.model
+    def _render_student_report_pdfs(self, student_ids: list[int]) -> dict[int, bytes]:
+        """
+        Renders the academic report of many students with a single wkhtmltopdf run and
+        splits the result per student along the PDF outlines. Students whose cached PDF
+        is still current are not rendered again.
+
+        Students the split could not isolate are left out, as is everything when the batch
+        fails (e.g. one broken record): callers render those one by one as before.
+        Skipped under tests, where reports are rendered as HTML anyway.
+
+        Returns:
+            dict[int, bytes]: Mapping of student IDs to their PDF.
+        """
+        if len(student_ids) < 2 or (
+            getattr(threading.current_thread(), 'testing', False)
+            and not self.env.context.get('force_report_rendering')
+        ):
+            return {}
+        try:
+            streams = self._render_qweb_pdf_prepare_streams(_STUDENT_REPORT_NAME, {}, res_ids=student_ids)
+        except Exception:
+            _logger.warning("Batch rendering of %d student reports failed, rendering them one by one",
+                            len(student_ids), exc_info=True)
+            return {}
+
+        pdfs = {}
+        for res_id, stream_data in streams.items():
+            if stream_data.get('stream'):
+                if res_id:
+                    pdfs[res_id] = stream_data['stream'].getvalue()
+                stream_data['stream'].close()
+        return pdfs
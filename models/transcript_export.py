@@ -0,0 +1,273 @@
+import logging
+import os
+import re
+import shutil
+import time
+import zipfile
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+_EXPORT_CHUNK_SIZE = 100
+# Seconds a cron run may spend on exports before handing over to its next trigger
+_EXPORT_TIME_BUDGET = 90
+_EXPORT_DIRECTORY = 'university_transcripts'
+_STUDENT_REPORT = 'university.action_report_student'
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w.-]+')
+
+
+class TranscriptExport(models.Model):
+    """
+    Background export of every academic transcript of a university, department or subject.
+
+    Students are rendered by the cron in chunks (keyset on the student id). Each chunk is
+    written to its own part file, which only appears once complete, so a crash never leaves
+    a corrupt archive behind and the chunk is simply replayed. The finished parts are then
+    assembled into one ZIP file kept next to the filestore, so neither the request nor the
+    memory grows with the size of the export. The file is served by
+    ``/university/transcripts/<id>/download``.
+    """
+    _name = 'university.transcript.export'
+    _inherit = ['university.chunk.commit.mixin']
+    _description = 'Transcript Export'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', compute='_compute_name', store=True)
+    scope = fields.Selection(
+        selection=[
+            ('university', 'University'),
+            ('department', 'Department'),
+            ('subject', 'Subject'),
+        ],
+        string='Scope',
+        required=True,
+        default='university',
+    )
+    university_id = fields.Many2one('university.university', string='University', required=True, ondelete='cascade')
+    department_id = fields.Many2one(
+        'university.department',
+        string='Department',
+        ondelete='cascade',
+        domain="[('university_id', '=', university_id)]",
+    )
+    subject_id = fields.Many2one(
+        'university.subject',
+        string='Subject',
+        ondelete='cascade',
+        domain="[('university_id', '=', university_id)]",
+    )
+    state = fields.Selection(
+        selection=[
+            ('draft', 'Draft'),
+            ('queued', 'Queued'),
+            ('running', 'Running'),
+            ('done', 'Done'),
+            ('failed', 'Failed'),
+        ],
+        string='Status',
+        default='draft',
+        required=True,
+        readonly=True,
+        copy=False,
+    )
+    requested_by = fields.Many2one('res.users', string='Requested By', default=lambda self: self.env.user, readonly=True)
+    student_count = fields.Integer(string='Students', readonly=True, copy=False)
+    processed_count = fields.Integer(string='Processed', readonly=True, copy=False)
+    progress = fields.Float(string='Progress', compute='_compute_progress')
+    last_student_id = fields.Integer(readonly=True, copy=False, help="Keyset cursor: last student written to the file.")
+    # Kilobytes: exports of large universities pass the 2 GiB an integer column holds in bytes
+    file_size = fields.Integer(string='File Size (KB)', readonly=True, copy=False)
+    date_done = fields.Datetime(string='Finished On', readonly=True, copy=False)
+    error = fields.Text(string='Error', readonly=True, copy=False)
+
+    @api.depends('scope', 'university_id.name', 'department_id.name', 'subject_id.name')
+    def _compute_name(self) -> None:
+        """Names the export after its scope."""
+        for record in self:
+            target = {
+                'university': record.university_id,
+                'department': record.department_id,
+                'subject': record.subject_id,
+            }[record.scope]
+            record.name = _("Transcripts - %s", target.name or '')
+
+    @api.depends('processed_count', 'student_count')
+    def _compute_progress(self) -> None:
+        """Percentage of the students already written to the file."""
+        for record in self:
+            record.progress = 100.0 * record.processed_count / record.student_count if record.student_count else 0.0
+
+    @api.constrains('scope', 'department_id', 'subject_id')
+    def _check_scope_target(self) -> None:
+        """
+        Validates that department and subject exports name their target.
+
+        Raises:
+            ValidationError: If the scope target is missing.
+        """
+        for record in self:
+            if record.scope == 'department' and not record.department_id:
+                raise ValidationError(_("Select the department to export."))
+            if record.scope == 'subject' and not record.subject_id:
+                raise ValidationError(_("Select the subject to export."))
+
+    def unlink(self):
+        """Removes the generated files along with the exports."""
+        records = list(self)
+        res = super().unlink()
+        for record in records:
+            record._remove_files()
+        return res
+
+    def _get_file_path(self) -> str:
+        """Absolute path of the ZIP file of this export, inside the database's filestore."""
+        self.ensure_one()
+        return os.path.join(config.filestore(self.env.cr.dbname), _EXPORT_DIRECTORY, f'transcripts_{self.id}.zip')
+
+    def _get_parts_directory(self) -> str:
+        """Directory holding the part files of this export until they are assembled."""
+        self.ensure_one()
+        return os.path.join(config.filestore(self.env.cr.dbname), _EXPORT_DIRECTORY, f'transcripts_{self.id}_parts')
+
+    def _remove_files(self) -> None:
+        """Deletes the ZIP file and the part files of this export, if any."""
+        path = self._get_file_path()
+        if os.path.exists(path):
+            os.unlink(path)
+        shutil.rmtree(self._get_parts_directory(), ignore_errors=True)
+
+    def _get_student_domain(self) -> list:
+        """Domain of the students whose transcript belongs to this export."""
+        self.ensure_one()
+        if self.scope == 'department':
+            return [('enrollment_ids.subject_id.department_id', '=', self.department_id.id)]
+        if self.scope == 'subject':
+            return [('enrollment_ids.subject_id', '=', self.subject_id.id)]
+        return [('university_id', '=', self.university_id.id)]
+
+    def action_start(self) -> None:
+        """Queues the exports and wakes the export cron up."""
+        for record in self:
+            if record.state not in ('draft', 'failed'):
+                raise UserError(_("Only draft or failed exports can be started."))
+            record._remove_files()
+            record.write({
+                'state': 'queued',
+                'student_count': self.env['university.student'].search_count(record._get_student_domain()),
+                'processed_count': 0,
+                'last_student_id': 0,
+                'file_size': 0,
+                'error': False,
+                'date_done': False,
+            })
+        # sudo(): scheduling a cron trigger is restricted to administrators
+        self.env.ref('university.ir_cron_process_transcript_exports').sudo()._trigger()
+
+    def action_download(self) -> dict:
+        """Downloads the finished ZIP file."""
+        self.ensure_one()
+        if self.state != 'done':
+            raise UserError(_("The export is not finished yet."))
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/university/transcripts/{self.id}/download',
+            'target': 'self',
+        }
+
+    @api.model
+    def _cron_process_exports(self) -> None:
+        """
+        Advances queued exports chunk by chunk until the time budget runs out, committing
+        after each chunk so a crash resumes from the last written student. Re-triggers
+        itself while exports remain unfinished.
+        """
+        deadline = time.monotonic() + _EXPORT_TIME_BUDGET
+        while time.monotonic() < deadline:
+            export = self.search([('state', 'in', ('queued', 'running'))], order='id', limit=1)
+            if not export:
+                return
+            try:
+                with self.env.cr.savepoint():
+                    export._process_chunk()
+            except Exception as e:
+                _logger.error("Transcript export %s failed", export.id, exc_info=True)
+                self.env.invalidate_all()
+                export.write({'state': 'failed', 'error': str(e)})
+            export._commit_chunk()
+
+        if self.search_count([('state', 'in', ('queued', 'running'))], limit=1):
+            self.env.ref('university.ir_cron_process_transcript_exports')._trigger()
+
+    def _process_chunk(self) -> None:
+        """
+        Renders the next chunk of transcripts into a part file of its own, or assembles the
+        parts once every student is written.
+        """
+        self.ensure_one()
+        students = self.env['university.student'].search(
+            self._get_student_domain() + [('id', '>', self.last_student_id)],
+            order='id',
+            limit=_EXPORT_CHUNK_SIZE,
+        )
+        if not students:
+            self._assemble_parts()
+            self.write({
+                'state': 'done',
+                'date_done': fields.Datetime.now(),
+                'file_size': os.path.getsize(self._get_file_path()) // 1024,
+            })
+            return
+
+        Report = self.env['ir.actions.report']
+        pdfs = Report._render_student_report_pdfs(students.ids)
+        parts_directory = self._get_parts_directory()
+        os.makedirs(parts_directory, exist_ok=True)
+        # Named after the cursor the chunk starts from: a chunk replayed after a crash
+        # rewrites its own part. The part is written aside and renamed once complete.
+        part_path = os.path.join(parts_directory, f'{self.last_student_id:012d}.zip')
+        with zipfile.ZipFile(part_path + '.tmp', mode='w', compression=zipfile.ZIP_STORED) as archive:
+            for student in students:
+                content = pdfs.get(student.id)
+                extension = 'pdf'
+                if content is None:
+                    content, extension = Report._render_qweb_pdf(_STUDENT_REPORT, student.ids)
+                archive.writestr(f"{_UNSAFE_FILENAME_CHARS.sub('_', student.name)}_{student.id}.{extension}", content)
+        os.replace(part_path + '.tmp', part_path)
+
+        self.write({
+            'state': 'running',
+            'processed_count': self.processed_count + len(students),
+            'last_student_id': students[-1].id,
+            'file_size': sum(os.path.getsize(path) for path in self._get_part_paths()) // 1024,
+        })
+
+    def _get_part_paths(self) -> list[str]:
+        """Complete part files of this export, in student order."""
+        parts_directory = self._get_parts_directory()
+        if not os.path.isdir(parts_directory):
+            return []
+        return [
+            os.path.join(parts_directory, name)
+            for name in sorted(os.listdir(parts_directory))
+            if name.endswith('.zip')
+        ]
+
+    def _assemble_parts(self) -> None:
+        """
+        Copies the entries of every part into the final ZIP file, streaming them so memory
+        stays flat. Entries are stored: PDFs are already compressed, and stored entries are
+        copied without being compressed again. The file is written aside and renamed once
+        complete, then the parts are removed.
+        """
+        path = self._get_file_path()
+        with zipfile.ZipFile(path + '.tmp', mode='w', compression=zipfile.ZIP_STORED) as archive:
+            for part_path in self._get_part_paths():
+                with zipfile.ZipFile(part_path) as part:
+                    for info in part.infolist():
+                        with part.open(info) as source, archive.open(info.filename, mode='w') as target:
+                            shutil.copyfileobj(source, target)
+        os.replace(path + '.tmp', path)
+        shutil.rmtree(self._get_parts_directory(), ignore_errors=True)
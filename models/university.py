@@ -1,7 +1,8 @@
 import logging
+from datetime import datetime
 
 from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError
+from odoo.tools import SQL
 
 _logger = logging.getLogger(__name__)
 
@@ -9,13 +10,22 @@ _logger = logging.getLogger(__name__)
 class University(models.Model):
     """Main entity grouping departments, professors, and students."""
     _name = 'university.university'
-    _inherit = ['image.mixin', 'batch.count.mixin', 'website.published.mixin', 'website.seo.metadata']
+    _inherit = [
+        'image.mixin', 'batch.count.mixin', 'website.published.mixin', 'website.seo.metadata',
+        'university.website.cache.mixin', 'university.ranked.search.mixin', 'university.batch.constraint.mixin',
+    ]
     _description = 'University'
+    _batch_counters = {
+        'professor_count': ('university.professor', 'university_id'),
+        'student_count': ('university.student', 'university_id'),
+        'enrollment_count': ('university.enrollment', 'university_id'),
+        'department_count': ('university.department', 'university_id'),
+    }
 
     name = fields.Char(
         string='Name',
         required=True,
-        index=True,
+        index='trigram',
         help="Official name of the university."
     )
     email = fields.Char(
@@ -76,28 +86,36 @@ class University(models.Model):
 
     professor_count = fields.Integer(
         compute='_compute_counts',
+        store=True,
         string='Professor Count'
     )
     student_count = fields.Integer(
         compute='_compute_counts',
+        store=True,
         string='Student Count'
     )
     enrollment_count = fields.Integer(
         compute='_compute_counts',
+        store=True,
         string='Enrollment Count'
     )
     department_count = fields.Integer(
         compute='_compute_counts',
+        store=True,
         string='Department Count'
     )
 
-    @api.depends('professor_ids', 'student_ids', 'enrollment_ids', 'department_ids')
+    @api.depends()
     def _compute_counts(self) -> None:
-        """Computes the number of related records for smart buttons without N+1 queries."""
-        prof_map = self._get_batch_counts('university.professor', 'university_id')
-        student_map = self._get_batch_counts('university.student', 'university_id')
-        enroll_map = self._get_batch_counts('university.enrollment', 'university_id')
-        dept_map = self._get_batch_counts('university.department', 'university_id')
+        """
+        Computes the number of related records for smart buttons without N+1 queries.
+        Stored counters: seeds new records and recounts; triggers maintain them afterwards.
+        """
+        counts = self._get_batch_counts_multi(list(self._batch_counters.values()))
+        prof_map = counts[('university.professor', 'university_id')]
+        student_map = counts[('university.student', 'university_id')]
+        enroll_map = counts[('university.enrollment', 'university_id')]
+        dept_map = counts[('university.department', 'university_id')]
 
         for record in self:
             record.professor_count = prof_map.get(record.id, 0)
@@ -105,12 +123,73 @@ class University(models.Model):
             record.enrollment_count = enroll_map.get(record.id, 0)
             record.department_count = dept_map.get(record.id, 0)
 
+    @api.model
+    def _get_website_stamp(self, university_id: int | None = None) -> tuple[str, datetime | None] | None:
+        """
+        Version of a public /universidad page: the university catalog (no id) or the
+        directory of one university with its professors and departments. Counts are part
+        of the version so deletions change it too. Computed once per transaction, until
+        one of those models changes (see university.website.cache.mixin).
+
+        Args:
+            university_id (int | None): University of the directory page, None for the catalog.
+
+        Returns:
+            tuple | None: (version hash, last modification) or None if the university does not exist.
+        """
+        stamps = self._get_website_stamps()
+        if university_id not in stamps:
+            stamps[university_id] = self._read_website_stamp(university_id)
+        return stamps[university_id]
+
+    @api.model
+    def _read_website_stamp(self, university_id: int | None) -> tuple[str, datetime | None] | None:
+        """Computes the stamp of ``_get_website_stamp`` with one query."""
+        for model_name in ('university.university', 'university.professor', 'university.department'):
+            self.env[model_name].flush_model()
+        if not university_id:
+            self.env.cr.execute(SQL(
+                """
+                SELECT md5(concat_ws(',', COUNT(*), MAX(write_date))), MAX(write_date)
+                  FROM %(university)s
+                """,
+                university=SQL.identifier(self._table),
+            ))
+            return self.env.cr.fetchone()
+
+        self.env.cr.execute(SQL(
+            """
+            SELECT md5(concat_ws(',', u.write_date, p.total, p.last_write, d.total, d.last_write)),
+                   GREATEST(u.write_date, p.last_write, d.last_write)
+              FROM %(university)s u,
+                   LATERAL (SELECT COUNT(*) AS total, MAX(write_date) AS last_write
+                              FROM %(professor)s WHERE university_id = u.id) p,
+                   LATERAL (SELECT COUNT(*) AS total, MAX(write_date) AS last_write
+                              FROM %(department)s WHERE university_id = u.id) d
+             WHERE u.id = %(university_id)s
+            """,
+            university=SQL.identifier(self._table),
+            professor=SQL.identifier(self.env['university.professor']._table),
+            department=SQL.identifier(self.env['university.department']._table),
+            university_id=university_id,
+        ))
+        return self.env.cr.fetchone()
+
     @api.constrains('director_id')
     def _check_director_university(self) -> None:
         """
         Validates that the assigned director belongs to the university.
         Raises ValidationError if the constraint is violated.
         """
-        for record in self:
-            if record.director_id and record.director_id.university_id != record:
-                raise ValidationError(_("The director must belong to the same university."))
\ No newline at end of file
+        violators = self._get_constraint_violators(SQL(
+            """
+            SELECT u.id
+              FROM %(university)s u
+              JOIN %(professor)s p ON p.id = u.director_id
+             WHERE u.id = ANY(%(ids)s) AND p.university_id IS DISTINCT FROM u.id
+            """,
+            university=SQL.identifier(self._table),
+            professor=SQL.identifier(self.env['university.professor']._table),
+            ids=self.ids,
+        ), ('university.professor',))
+        violators._raise_constraint_violations(_("The director must belong to the same university."))
\ No newline at end of file
@@ -54,15 +54,16 @@ export class StudentEmailWidget extends Component {
             );
 
             if (result) {
+                // Delivery happens in the background; its outcome arrives as a bus notification
                 this.notification.add(
-                    sprintf(_t("An email with the grades has been sent to %s."), result),
-                    { type: "success" }
+                    sprintf(_t("The report for %s has been queued. You will be notified once it is sent."), result),
+                    { type: "info" }
                 );
             }
         } catch (error) {
             console.error("Error sending email:", error);
             this.notification.add(
-                _t("Failed to send the report. Check the server logs for details."),
+                _t("Failed to queue the report. Check the server logs for details."),
                 { type: "danger" }
             );
         }
@@ -1,3 +1,10 @@
 from . import test_optimization
 from . import test_data_check
 from . import test_constraints
+from . import test_report
+from . import test_enrollment_import
+from . import test_report_mail
+from . import test_report_benchmark
+from . import test_transcript_export
+from . import test_grade_statistics
+from . import test_portal_grades
@@ -126,3 +126,19 @@ class TestConstraints(TransactionCase):
                 'enrollment_id': enrollment.id,
                 'score': 10.1,
             })
+
+    def test_constraint_reports_every_violator(self):
+        """Batch validators reject the whole write and name every violating record."""
+        student_2 = self.env['university.student'].create({
+            'name': 'Student Test 2',
+            'email': 'stu2_test_cons@example.com',
+            'university_id': self.uni_1.id
+        })
+        students = self.student_1 | student_2
+        with self.assertRaises(ValidationError) as error:
+            students.write({'tutor_id': self.prof_2.id})
+        self.assertIn('Student Test 1', str(error.exception))
+        self.assertIn('Student Test 2', str(error.exception))
+
+        students.write({'tutor_id': self.prof_1.id})
+        self.assertEqual(students.tutor_id, self.prof_1)
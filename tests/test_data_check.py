@@ -1,5 +1,10 @@
+from unittest.mock import patch
+
 from odoo.tests.common import TransactionCase
 from odoo.exceptions import AccessError
+from odoo.addons.base.models.ir_mail_server import MailDeliveryException
+from odoo.addons.mail.models.mail_template import MailTemplate
+from odoo.tools import mute_logger
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -83,3 +88,92 @@ class TestDataCheck(TransactionCase):
         except (AccessError, ValueError):
             pass
 
+
+    def test_portal_keys_follow_student_user(self):
+        """Grades and enrollments carry the student's portal user, also after relinking."""
+        portal_uni = self.env['university.university'].create({'name': 'Test Uni Portal Keys'})
+        dept = self.env['university.department'].create({
+            'name': 'Test Dept Keys',
+            'university_id': portal_uni.id,
+        })
+        subject = self.env['university.subject'].create({
+            'name': 'Test Subject Keys',
+            'code': 'TEST_KEYS',
+            'department_id': dept.id,
+        })
+        student = self.env['university.student'].create({
+            'name': 'Test Student Keys',
+            'email': 'student_keys_test@example.com',
+            'university_id': portal_uni.id,
+        })
+        enrollment = self.env['university.enrollment'].create({
+            'student_id': student.id,
+            'university_id': portal_uni.id,
+            'subject_id': subject.id,
+        })
+        grade = self.env['university.grade'].create({'enrollment_id': enrollment.id, 'score': 7.0})
+        self.assertEqual(enrollment.user_id, student.user_id)
+        self.assertEqual(grade.user_id, student.user_id)
+
+        portal_user = student.user_id
+        self.assertEqual(subject.with_user(portal_user).search([('id', '=', subject.id)]), subject)
+        student.user_id = False
+        self.assertFalse(enrollment.user_id)
+        self.assertFalse(grade.user_id)
+        self.assertFalse(self.env['university.grade'].with_user(portal_user).search([('id', '=', grade.id)]))
+
+    def test_deferred_portal_provisioning(self):
+        """Deferred students are created without users and provisioned by the cron."""
+        university = self.env['university.university'].create({'name': 'Test Uni Deferred Portal'})
+        Student = self.env['university.student'].with_context(defer_portal_provisioning=True)
+        students = Student.create([{
+            'name': f'Deferred Student {index}',
+            'email': f'deferred_{index}@example.com',
+            'university_id': university.id,
+        } for index in range(3)])
+        self.assertFalse(students.user_id)
+        self.assertEqual(set(students.mapped('portal_state')), {'pending'})
+
+        self.env['university.student']._cron_provision_portal_users()
+        self.assertEqual(set(students.mapped('portal_state')), {'done'})
+        self.assertEqual(students.user_id.mapped('login'), students.mapped('email'))
+        self.assertTrue(all(user._is_portal() for user in students.user_id))
+        # Accounts have no shared password: students are invited to sign up
+        self.assertEqual(set(students.user_id.partner_id.mapped('signup_type')), {'signup'})
+
+    @mute_logger('odoo.addons.university.models.academic_entities')
+    def test_invitation_failure_keeps_student(self):
+        """A failing invitation is recorded on the student instead of aborting its creation."""
+        university = self.env['university.university'].create({'name': 'Test Uni Invitation'})
+        with patch.object(MailTemplate, 'send_mail_batch', side_effect=MailDeliveryException("SMTP down")):
+            student = self.env['university.student'].with_context(defer_portal_provisioning=False).create({
+                'name': 'Uninvited Student',
+                'email': 'uninvited@example.com',
+                'university_id': university.id,
+            })
+        self.assertEqual(student.user_id.login, 'uninvited@example.com')
+        self.assertEqual(student.portal_state, 'done')
+        self.assertIn("SMTP down", student.portal_error)
+        self.assertFalse(student.user_id.partner_id.signup_type)
+
+    def test_users_link_orphan_students_in_batch(self):
+        """Users created for orphan students are linked to them, one student per user."""
+        university = self.env['university.university'].create({'name': 'Test Uni User Sync'})
+        students = self.env['university.student'].with_context(defer_portal_provisioning=True).create([{
+            'name': f'Orphan Student {index}',
+            'email': f'orphan_{index}@example.com',
+            'university_id': university.id,
+        } for index in range(3)])
+        portal_group = self.env.ref('base.group_portal')
+        users = self.env['res.users'].create([{
+            'name': email,
+            'login': email,
+            'email': email,
+            'group_ids': [(6, 0, [portal_group.id])],
+        } for email in students.mapped('email')])
+
+        self.assertEqual(students.user_id, users)
+        for student in students:
+            self.assertEqual(student.user_id.login, student.email)
+        self.assertEqual(set(students.mapped('portal_state')), {'done'})
+        self.assertEqual(self.env['university.student'].search([('user_id', '=', users[0].id)]), students[0])
@@ -0,0 +1,120 @@
+import io
+
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('university')
+class TestEnrollmentImport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.university = cls.env['university.university'].create({'name': 'Import Uni'})
+        cls.other_university = cls.env['university.university'].create({'name': 'Import Other Uni'})
+        cls.department = cls.env['university.department'].create({
+            'name': 'Import Dept',
+            'university_id': cls.university.id,
+        })
+        cls.professor = cls.env['university.professor'].create({
+            'name': 'Import Prof',
+            'email': 'import_prof@example.com',
+            'university_id': cls.university.id,
+            'department_id': cls.department.id,
+        })
+        cls.subject = cls.env['university.subject'].create({
+            'name': 'Import Subject',
+            'code': 'IMP101',
+            'department_id': cls.department.id,
+            'professor_ids': [(4, cls.professor.id)],
+        })
+        cls.other_subject = cls.env['university.subject'].create({
+            'name': 'Import Other Subject',
+            'code': 'IMP102',
+            'department_id': cls.department.id,
+        })
+        cls.student_1 = cls.env['university.student'].create({
+            'name': 'Import Student 1',
+            'email': 'import_stu1@example.com',
+            'university_id': cls.university.id,
+        })
+        cls.student_2 = cls.env['university.student'].create({
+            'name': 'Import Student 2',
+            'email': 'import_stu2@example.com',
+            'university_id': cls.university.id,
+        })
+        cls.foreign_student = cls.env['university.student'].create({
+            'name': 'Import Foreign Student',
+            'email': 'import_foreign@example.com',
+            'university_id': cls.other_university.id,
+        })
+
+    def test_import_iterator_reports_row_errors(self):
+        """Valid rows are created while invalid ones are reported with their row number."""
+        rows = [
+            {'student_email': 'import_stu1@example.com', 'subject_code': 'IMP101',
+             'professor_email': 'import_prof@example.com'},
+            {'student_email': 'import_stu2@example.com', 'subject_code': 'IMP101'},
+            {'student_email': 'nobody@example.com', 'subject_code': 'IMP101'},
+            {'student_email': 'import_stu1@example.com', 'subject_code': 'IMP101'},
+            {'student_email': 'import_stu2@example.com', 'subject_code': 'IMP102',
+             'professor_email': 'import_prof@example.com'},
+            {'student_id': self.foreign_student.id, 'subject_id': self.subject.id},
+        ]
+        result = self.env['university.enrollment.import'].import_enrollments(
+            iter(rows), chunk_size=2,
+        )
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([error['row'] for error in result['errors']], [3, 4, 5, 6])
+        enrollments = self.env['university.enrollment'].search([('subject_id', '=', self.subject.id)])
+        self.assertEqual(enrollments.student_id, self.student_1 | self.student_2)
+        self.assertEqual(
+            enrollments.filtered(lambda e: e.student_id == self.student_1).professor_id,
+            self.professor,
+        )
+
+    def test_import_csv_stream(self):
+        """CSV streams are parsed with their header row."""
+        stream = io.StringIO(
+            "student_email,subject_code\n"
+            "import_stu1@example.com,IMP102\n"
+            "import_stu2@example.com,IMP102\n"
+        )
+        result = self.env['university.enrollment.import'].import_enrollments(
+            stream, university_id=self.university.id, file_format='csv',
+        )
+        self.assertEqual(result, {'created': 2, 'errors': []})
+
+    def test_import_jsonl_reports_malformed_lines(self):
+        """Malformed JSON lines and non-object rows are reported without aborting the load."""
+        stream = io.StringIO(
+            '{"student_email": "import_stu1@example.com", "subject_code": "IMP102"}\n'
+            '{"student_email": "import_stu2@example.com", "subject_code": \n'
+            '\n'
+            '["import_stu2@example.com", "IMP102"]\n'
+            '{"student_email": "import_stu2@example.com", "subject_code": "IMP102"}\n'
+        )
+        result = self.env['university.enrollment.import'].import_enrollments(
+            stream, university_id=self.university.id, file_format='jsonl',
+        )
+        self.assertEqual(result['created'], 2)
+        self.assertEqual([error['row'] for error in result['errors']], [2, 3])
+        self.assertIn('Line 2', result['errors'][0]['error'])
+
+    def test_import_rows_stay_in_imported_university(self):
+        """Rows of a load restricted to a university cannot point at another one."""
+        rows = [
+            {'student_id': self.foreign_student.id, 'subject_id': self.subject.id,
+             'university_id': self.other_university.id},
+            {'student_email': 'import_stu1@example.com', 'subject_code': 'IMP102',
+             'university_id': self.other_university.id},
+            {'student_email': 'import_stu2@example.com', 'subject_code': 'IMP102'},
+        ]
+        result = self.env['university.enrollment.import'].import_enrollments(
+            iter(rows), university_id=self.university.id,
+        )
+        self.assertEqual(result['created'], 1)
+        self.assertEqual([error['row'] for error in result['errors']], [1, 2])
+        self.assertFalse(self.env['university.enrollment'].search([
+            ('university_id', '=', self.other_university.id),
+        ]))
@@ -0,0 +1,101 @@
+from odoo.tests.common import TransactionCase, tagged
+
+from odoo.addons.university.models import grade_statistics
+
+
+@tagged('university')
+class TestGradeStatistics(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.university = cls.env['university.university'].create({'name': 'Stats Uni'})
+        cls.department = cls.env['university.department'].create({
+            'name': 'Stats Dept',
+            'university_id': cls.university.id,
+        })
+        cls.professor = cls.env['university.professor'].create({
+            'name': 'Stats Prof',
+            'university_id': cls.university.id,
+            'department_id': cls.department.id,
+        })
+        cls.subject = cls.env['university.subject'].create({
+            'name': 'Stats Subject',
+            'code': 'STA101',
+            'department_id': cls.department.id,
+            'professor_ids': [(4, cls.professor.id)],
+        })
+        cls.enrollments = cls.env['university.enrollment'].create([{
+            'student_id': cls.env['university.student'].create({
+                'name': f'Stats Student {index}',
+                'email': f'stats_student_{index}@example.com',
+                'university_id': cls.university.id,
+            }).id,
+            'university_id': cls.university.id,
+            'subject_id': cls.subject.id,
+            'professor_id': cls.professor.id,
+        } for index in range(4)])
+        cls.env['university.grade'].create([
+            {'enrollment_id': enrollment.id, 'score': score}
+            for enrollment, score in zip(cls.enrollments, (2.0, 4.0, 6.0, 10.0))
+        ])
+
+    def test_subject_distribution(self):
+        """The statistics describe the whole distribution of each group."""
+        Statistics = self.env['university.grade.statistics']
+        Statistics._refresh_if_stale()
+        row = Statistics.search([('dimension', '=', 'subject'), ('subject_id', '=', self.subject.id)])
+        self.assertEqual(row.university_id, self.university)
+        self.assertEqual(row.grade_count, 4)
+        self.assertAlmostEqual(row.score_mean, 5.5)
+        self.assertAlmostEqual(row.score_median, 5.0)
+        self.assertAlmostEqual(row.score_p25, 3.5)
+        self.assertAlmostEqual(row.score_std, 2.958, places=3)
+        self.assertAlmostEqual(row.pass_rate, 50.0)
+        self.assertEqual(
+            [row.bucket_0_2, row.bucket_2_4, row.bucket_4_6, row.bucket_6_8, row.bucket_8_10],
+            [0, 1, 1, 1, 1],
+        )
+        self.assertEqual(
+            Statistics.search([('dimension', '=', 'professor'), ('professor_id', '=', self.professor.id)]).grade_count, 4,
+        )
+
+    def test_cached_until_grades_change(self):
+        """Statistics are only recomputed after the grades changed."""
+        Statistics = self.env['university.grade.statistics']
+        Statistics._refresh_if_stale()
+        self.assertFalse(Statistics._is_stale())
+        self.assertFalse(Statistics._refresh_if_stale())
+
+        self.enrollments[0].grade_ids.unlink()
+        self.assertTrue(Statistics._is_stale())
+        self.assertTrue(Statistics._refresh_if_stale())
+        row = Statistics.search([('dimension', '=', 'subject'), ('subject_id', '=', self.subject.id)])
+        self.assertEqual(row.grade_count, 3)
+        self.assertAlmostEqual(row.score_median, 6.0)
+
+    def test_numpy_matches_python(self):
+        """Both engines produce the same summary."""
+        if grade_statistics.np is None:
+            self.skipTest("NumPy is not installed")
+        rows = [(1, 10, 2.0), (1, 10, 4.5), (1, 10, 8.0), (3, 10, 5.0), (3, 10, 5.0), (7, 11, 9.5)]
+        vectorized = grade_statistics._summarize_numpy(rows)
+        fallback = grade_statistics._summarize_python(rows)
+        for fname, values in fallback.items():
+            for vectorized_value, value in zip(vectorized[fname], values):
+                self.assertAlmostEqual(vectorized_value, value, msg=fname)
+
+    def test_open_does_not_recompute(self):
+        """Opening stale statistics queues the refresh cron and serves the stored rows."""
+        Statistics = self.env['university.grade.statistics']
+        Statistics._refresh_if_stale()
+        rows = Statistics.search([])
+        cron = self.env.ref('university.ir_cron_refresh_grade_statistics')
+        triggers = self.env['ir.cron.trigger'].search([('cron_id', '=', cron.id)])
+
+        self.enrollments[0].grade_ids.unlink()
+        action = Statistics.action_open_statistics()
+
+        self.assertEqual(action['res_model'], 'university.grade.statistics')
+        self.assertEqual(Statistics.search([]), rows, "The request must not recompute")
+        self.assertGreater(len(self.env['ir.cron.trigger'].search([('cron_id', '=', cron.id)])), len(triggers))
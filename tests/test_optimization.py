@@ -59,3 +59,164 @@ class TestUniversityCounts(TransactionCase):
         
         # Subject Counts
         self.assertEqual(self.subject.enrollment_count, 1, "Subject should have 1 enrollment")
+
+    def test_enrollment_codes_reserved_in_batch(self):
+        """Batch creation reserves distinct, correctly formatted codes per subject."""
+        students = self.env['university.student'].create([{
+            'name': f'Batch Student {index}',
+            'email': f'batch_student_{index}_opt@example.com',
+            'university_id': self.university.id,
+        } for index in range(3)])
+        enrollments = self.env['university.enrollment'].create([{
+            'student_id': student.id,
+            'subject_id': self.subject.id,
+            'university_id': self.university.id,
+        } for student in students])
+
+        codes = enrollments.mapped('code')
+        self.assertEqual(len(set(codes)), 3, "Each enrollment must get its own code")
+        for code in codes:
+            self.assertRegex(code, r'^TES/\d{4}/\d{4}$')
+        self.assertEqual(
+            self.env['ir.sequence'].sudo().search_count([('code', '=', f'enrollment.subject.{self.subject.id}')]),
+            1,
+            "The subject sequence must be created once and reused",
+        )
+
+    def test_subject_sequence_misses_not_cached(self):
+        """A subject without sequence is looked up again once its first enrollment created one."""
+        Enrollment = self.env['university.enrollment']
+        subject = self.env['university.subject'].create({
+            'name': 'Sequence Subject',
+            'code': 'SEQ101',
+            'department_id': self.department.id,
+        })
+        self.assertIsNone(Enrollment._get_subject_sequence_id(subject.id))
+        Enrollment.create({
+            'student_id': self.student.id,
+            'subject_id': subject.id,
+            'university_id': self.university.id,
+        })
+        sequence = self.env['ir.sequence'].sudo().search([('code', '=', f'enrollment.subject.{subject.id}')])
+        self.assertEqual(Enrollment._get_subject_sequence_id(subject.id), sequence.id)
+
+    def test_stored_counters_follow_children(self):
+        """Stored counters follow reassignments and deletions, and can be repaired."""
+        other_department = self.env['university.department'].create({
+            'name': 'Other Department',
+            'university_id': self.university.id,
+        })
+        self.professor.write({'department_id': other_department.id})
+        self.assertEqual(self.department.professor_count, 0)
+        self.assertEqual(other_department.professor_count, 1)
+        self.assertEqual(self.university.department_count, 2)
+
+        self.grade.unlink()
+        self.assertEqual(self.student.grade_count, 0)
+
+        # Stored counters are searchable and sortable
+        self.assertIn(self.university, self.env['university.university'].search([('student_count', '>', 0)]))
+
+        # Simulate drift, then repair
+        self.env.cr.execute(
+            "UPDATE university_university SET student_count = 42 WHERE id = %s", [self.university.id]
+        )
+        self.university.invalidate_recordset(['student_count'])
+        self.university._recount_batch_counters()
+        self.assertEqual(self.university.student_count, 1)
+
+    def test_counter_triggers_reinstalled(self):
+        """init() finds the counters fed by a child among all registry models and reinstalls them."""
+        Grade = self.env['university.grade']
+        self.assertIn(('university.student', 'grade_count', 'student_id'), Grade._get_batch_counter_targets(Grade._name))
+        self.assertFalse(Grade._get_batch_counter_targets('res.partner'))
+        Grade.init()
+        Grade.create({'enrollment_id': self.enrollment.id, 'score': 7.0})
+        self.assertEqual(self.student.grade_count, 2)
+
+        self.env['batch.count.mixin']._recount_all_batch_counters()
+        self.assertEqual(self.student.grade_count, 2)
+
+    def test_batch_counts_multi(self):
+        """Several relations are counted with one statement."""
+        relations = [
+            ('university.professor', 'university_id'),
+            ('university.enrollment', 'university_id'),
+            ('university.department', 'university_id'),
+        ]
+        with self.assertQueryCount(1):
+            counts = self.university._get_batch_counts_multi(relations)
+        self.assertEqual(counts, {relation: {self.university.id: 1} for relation in relations})
+
+    def test_transcript_loader_single_query(self):
+        """The transcript of any number of students is loaded with one query."""
+        other_student = self.env['university.student'].create({
+            'name': 'Other Student',
+            'email': 'other_student_opt@example.com',
+            'university_id': self.university.id,
+        })
+        students = self.student | other_student
+        self.env.flush_all()
+
+        with self.assertQueryCount(1):
+            transcripts = students._get_transcript_data()
+
+        self.assertEqual(transcripts[other_student.id], {'summary': [], 'grades': []})
+        self.assertEqual(transcripts[self.student.id]['summary'], [{
+            'subject': 'Test Subject',
+            'professor': 'Test Professor',
+            'average': 10.0,
+        }])
+        self.assertEqual([grade['score'] for grade in transcripts[self.student.id]['grades']], [10.0])
+
+    def test_website_stamp_follows_directory_changes(self):
+        """Public page stamps are computed once and change with any shown record, deletions included."""
+        University = self.env['university.university']
+        catalog_stamp = University._get_website_stamp()
+        with self.assertQueryCount(1):
+            stamp = University._get_website_stamp(self.university.id)
+        with self.assertQueryCount(0):
+            self.assertEqual(University._get_website_stamp(self.university.id), stamp)
+
+        professor = self.env['university.professor'].create({
+            'name': 'Website Professor',
+            'university_id': self.university.id,
+            'department_id': self.department.id,
+        })
+        created_stamp = University._get_website_stamp(self.university.id)
+        self.assertNotEqual(created_stamp[0], stamp[0])
+        self.assertEqual(University._get_website_stamp(), catalog_stamp, "The catalog does not list professors")
+
+        professor.unlink()
+        self.assertNotEqual(University._get_website_stamp(self.university.id)[0], created_stamp[0])
+        self.assertIsNone(University._get_website_stamp(-1))
+
+    def test_ranked_search(self):
+        """Substring matches on any ranked field are returned, the closest ones first."""
+        Professor = self.env['university.professor']
+        closest = Professor.create({
+            'name': 'Ranked Smith',
+            'university_id': self.university.id,
+            'department_id': self.department.id,
+        })
+        farther = Professor.create({
+            'name': 'Ranked Smithson-Whitaker',
+            'university_id': self.university.id,
+            'department_id': self.department.id,
+        })
+        by_email = Professor.create({
+            'name': 'Ranked Other',
+            'email': 'smith.ranked@example.com',
+            'university_id': self.university.id,
+            'department_id': self.department.id,
+        })
+
+        results = Professor._search_ranked('smith', [('name', 'like', 'Ranked')])
+        self.assertEqual(set(results.ids), {closest.id, farther.id, by_email.id})
+        if self.env.registry.has_trigram:
+            self.assertEqual(results[0], closest)
+        self.assertEqual(Professor._search_ranked('smith', [('id', '=', farther.id)]), farther)
+        # The public search only matches names
+        results = Professor._search_ranked('smith', [('name', 'like', 'Ranked')], fnames=('name',))
+        self.assertEqual(set(results.ids), {closest.id, farther.id})
+        self.assertFalse(Professor._search_ranked('  '))
@@ -0,0 +1,81 @@
+from datetime import date
+
+from odoo.tests.common import TransactionCase, tagged
+
+from odoo.addons.university.controllers import portal
+
+
+@tagged('university')
+class TestPortalGradesKeyset(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.university = cls.env['university.university'].create({'name': 'Keyset Uni'})
+        cls.department = cls.env['university.department'].create({
+            'name': 'Keyset Dept',
+            'university_id': cls.university.id,
+        })
+        cls.subject = cls.env['university.subject'].create({
+            'name': 'Keyset Subject',
+            'code': 'KEY101',
+            'department_id': cls.department.id,
+        })
+        cls.student = cls.env['university.student'].create({
+            'name': 'Keyset Student',
+            'email': 'keyset_student@example.com',
+            'university_id': cls.university.id,
+        })
+        enrollment = cls.env['university.enrollment'].create({
+            'student_id': cls.student.id,
+            'subject_id': cls.subject.id,
+            'university_id': cls.university.id,
+        })
+        # Ties on the date and undated grades exercise every branch of the seek domain
+        dates = [date(2024, 10, 1), date(2024, 10, 1), False, date(2025, 2, 1), False, date(2023, 12, 1), date(2025, 2, 1)]
+        cls.grades = cls.env['university.grade'].create([
+            {'enrollment_id': enrollment.id, 'score': 5.0, 'date': day} for day in dates
+        ])
+        cls.domain = [('student_id', '=', cls.student.id)]
+
+    def _walk(self, descending):
+        """Walks every page forwards, then back from the last one, with pages of 2 grades."""
+        Grade = self.env['university.grade']
+        pages, after_id = [], None
+        while True:
+            grades, next_id, prev_id = portal._seek_grades_page(Grade, self.domain, descending, after_id, None, 2)
+            self.assertEqual(bool(prev_id), bool(pages), "Only the first page has no previous link")
+            pages.append(grades)
+            if not next_id:
+                break
+            after_id = next_id
+
+        back_pages, before_id = [pages[-1]], prev_id
+        while before_id:
+            grades, next_id, before_id = portal._seek_grades_page(Grade, self.domain, descending, None, before_id, 2)
+            self.assertTrue(next_id)
+            back_pages.insert(0, grades)
+        return pages, back_pages
+
+    def test_walk_pages_both_orderings(self):
+        """Forward and backward walks visit every grade once, in the order of a plain search."""
+        Grade = self.env['university.grade']
+        for descending in (True, False):
+            direction = 'desc' if descending else 'asc'
+            expected = Grade.search(self.domain, order=f'date {direction}, id {direction}')
+            pages, back_pages = self._walk(descending)
+            self.assertEqual(len(pages), 4)
+            self.assertEqual([grade for page in pages for grade in page], list(expected))
+            self.assertEqual([page.ids for page in back_pages], [page.ids for page in pages])
+
+    def test_stale_cursors_start_over(self):
+        """Cursors of another listing, or outside the domain, lead back to the first page."""
+        self.assertIsNone(portal._parse_cursor(f'date.all.0-{self.grades[0].id}', 'date.2024.0'))
+        self.assertEqual(portal._parse_cursor(f'date.2024.0-{self.grades[0].id}', 'date.2024.0'), self.grades[0].id)
+
+        Grade = self.env['university.grade']
+        outside = [('date', '!=', False)] + self.domain
+        undated = self.grades.filtered(lambda grade: not grade.date)[0]
+        grades, _next_id, prev_id = portal._seek_grades_page(Grade, outside, True, undated.id, None, 2)
+        self.assertFalse(prev_id)
+        self.assertEqual(grades, Grade.search(outside, order='date desc, id desc', limit=2))
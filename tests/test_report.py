@@ -0,0 +1,87 @@
+from odoo.tests.common import TransactionCase, tagged
+from odoo.tools.sql import TableKind, table_kind
+
+
+@tagged('university')
+class TestMaterializedReport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.university = cls.env['university.university'].create({'name': 'Report Uni'})
+        cls.department = cls.env['university.department'].create({
+            'name': 'Report Dept',
+            'university_id': cls.university.id,
+        })
+        cls.professor = cls.env['university.professor'].create({
+            'name': 'Report Prof',
+            'university_id': cls.university.id,
+            'department_id': cls.department.id,
+        })
+        cls.subject = cls.env['university.subject'].create({
+            'name': 'Report Subject',
+            'code': 'REP101',
+            'department_id': cls.department.id,
+            'professor_ids': [(4, cls.professor.id)],
+        })
+        cls.student = cls.env['university.student'].create({
+            'name': 'Report Student',
+            'email': 'report_student_mat@example.com',
+            'university_id': cls.university.id,
+        })
+        cls.enrollment = cls.env['university.enrollment'].create({
+            'student_id': cls.student.id,
+            'subject_id': cls.subject.id,
+            'professor_id': cls.professor.id,
+            'university_id': cls.university.id,
+        })
+        cls.env['ir.config_parameter'].sudo().set_param('university.report_materialized', 'True')
+        cls.env['university.report']._refresh_full()
+
+    def _report_row(self):
+        return self.env['university.report'].search([('id', '=', self.enrollment.id)])
+
+    def test_materialized_row_follows_grades(self):
+        """Grade create/write/unlink refresh the stored report row incrementally."""
+        self.assertFalse(self._report_row().score, "Ungraded enrollment has no average")
+
+        grade = self.env['university.grade'].create({'enrollment_id': self.enrollment.id, 'score': 6.0})
+        self.env['university.grade'].create({'enrollment_id': self.enrollment.id, 'score': 8.0})
+        self.assertAlmostEqual(self._report_row().score, 7.0)
+
+        grade.write({'score': 10.0})
+        self.assertAlmostEqual(self._report_row().score, 9.0)
+
+        grade.unlink()
+        self.assertAlmostEqual(self._report_row().score, 8.0)
+
+    def test_materialized_row_removed_with_enrollment(self):
+        """Deleting the enrollment drops its report row through the cascading foreign key."""
+        self.assertTrue(self._report_row())
+        self.enrollment.unlink()
+        self.assertFalse(self._report_row())
+
+    def test_switch_back_to_view(self):
+        """Disabling the parameter rebuilds the plain view without waiting for a refresh."""
+        self.env['ir.config_parameter'].sudo().set_param('university.report_materialized', 'False')
+        self.assertEqual(table_kind(self.env.cr, 'university_report'), TableKind.View)
+        self.env['university.grade'].create({'enrollment_id': self.enrollment.id, 'score': 4.0})
+        self.assertAlmostEqual(self._report_row().score, 4.0)
+
+    def test_switch_to_table_without_refresh(self):
+        """Grades can be written right after enabling the parameter, and feed the new table."""
+        Param = self.env['ir.config_parameter'].sudo()
+        Param.set_param('university.report_materialized', 'False')
+        Param.set_param('university.report_materialized', 'True')
+        self.assertEqual(table_kind(self.env.cr, 'university_report'), TableKind.Regular)
+        self.env['university.grade'].create({'enrollment_id': self.enrollment.id, 'score': 6.0})
+        self.assertAlmostEqual(self._report_row().score, 6.0)
+
+    def test_rows_follow_relation_not_parameter(self):
+        """Incremental refreshes follow the relation in place, whatever the parameter says."""
+        self.env.cr.execute(
+            "UPDATE ir_config_parameter SET value = 'False' WHERE key = 'university.report_materialized'"
+        )
+        self.env['ir.config_parameter'].invalidate_model()
+        self.env['university.grade'].create({'enrollment_id': self.enrollment.id, 'score': 2.0})
+        self.assertAlmostEqual(self._report_row().score, 2.0)
@@ -0,0 +1,48 @@
+import logging
+import time
+import unittest
+
+from odoo.tests.common import TransactionCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('university_benchmark', '-standard')
+class TestReportRenderingBenchmark(TransactionCase):
+    """
+    Compares per-student and batched PDF rendering of the academic report.
+    Opt-in (needs wkhtmltopdf): ``--test-tags university_benchmark``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if cls.env['ir.actions.report'].get_wkhtmltopdf_state() != 'ok':
+            raise unittest.SkipTest("wkhtmltopdf is not available")
+        cls.university = cls.env['university.university'].create({'name': 'Benchmark Uni'})
+        cls.students = cls.env['university.student'].create([{
+            'name': f'Benchmark Student {i}',
+            'email': f'benchmark_student_{i}@example.com',
+            'university_id': cls.university.id,
+        } for i in range(20)])
+
+    def test_batch_rendering_throughput(self):
+        Report = self.env['ir.actions.report'].with_context(force_report_rendering=True)
+
+        started = time.monotonic()
+        for student in self.students:
+            Report._render_qweb_pdf('university.action_report_student', student.ids)
+        single_rate = len(self.students) / (time.monotonic() - started)
+
+        # Both measures must render: drop the PDFs the first one cached
+        self.students._invalidate_report_pdf_cache()
+        started = time.monotonic()
+        pdfs = Report._render_student_report_pdfs(self.students.ids)
+        batch_rate = len(self.students) / (time.monotonic() - started)
+
+        _logger.info("Academic report rendering: %.1f students/s one by one, %.1f students/s batched (x%.1f)",
+                     single_rate, batch_rate, batch_rate / single_rate)
+        # The outline split isolated every student: nothing falls back to per-record rendering
+        self.assertEqual(set(pdfs), set(self.students.ids), "Every student gets its own PDF piece")
+        self.assertTrue(all(pdf.startswith(b'%PDF') for pdf in pdfs.values()))
+        self.assertEqual(len(set(pdfs.values())), len(self.students), "Pieces must differ per student")
@@ -0,0 +1,216 @@
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+
+@tagged('university')
+class TestPendingReportCron(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.university = cls.env['university.university'].create({'name': 'Mail Uni'})
+        cls.students = cls.env['university.student'].create([{
+            'name': f'Mail Student {i}',
+            'email': f'mail_student_{i}@example.com',
+            'university_id': cls.university.id,
+            'report_pending': True,
+        } for i in range(25)])
+        cls.cron = cls.env.ref('university.ir_cron_process_pending_reports')
+
+    def _cron_triggers(self):
+        return self.env['ir.cron.trigger'].search([('cron_id', '=', self.cron.id)])
+
+    def test_cron_drains_backlog_in_chunks(self):
+        """Within its budget the cron keeps claiming chunks until nothing is pending."""
+        self.env['ir.config_parameter'].sudo().set_param('university.report_cron_time_budget', '600')
+        triggers = self._cron_triggers()
+
+        self.env['university.student']._cron_process_pending_reports()
+
+        self.assertFalse(self.students.filtered('report_pending'))
+        self.assertEqual(self._cron_triggers(), triggers, "An empty backlog must not re-trigger the cron")
+
+    def test_cron_retriggers_when_budget_exhausted(self):
+        """A run without budget leaves the backlog untouched and schedules itself again."""
+        self.env['ir.config_parameter'].sudo().set_param('university.report_cron_time_budget', '0')
+        triggers = self._cron_triggers()
+
+        self.env['university.student']._cron_process_pending_reports()
+
+        self.assertEqual(self.students.filtered('report_pending'), self.students)
+        self.assertGreater(len(self._cron_triggers()), len(triggers))
+
+    def test_claims_are_disjoint_and_leases_expire(self):
+        """Claimed students are not handed out twice until their lease expires."""
+        Student = self.env['university.student']
+        first = Student._claim_pending_reports(10)
+        second = Student._claim_pending_reports(100)
+
+        self.assertEqual(len(first), 10)
+        self.assertFalse(first & second)
+        self.assertEqual((first | second) & self.students, self.students)
+        self.assertFalse(Student._claim_pending_reports(100) & self.students)
+
+        # A crashed worker never releases its claim: the lease runs out instead
+        first.write({'report_claimed_until': '2000-01-01 00:00:00'})
+        self.assertEqual(Student._claim_pending_reports(100) & self.students, first)
+
+    def test_failing_report_backs_off_then_dead_letters(self):
+        """Failures are retried with a backoff, then dead-lettered with a single chatter message."""
+        self.env['ir.config_parameter'].sudo().set_param('university.report_max_attempts', '2')
+        Student = self.env['university.student']
+        template = self.env.ref('university.email_template_student_report')
+        student = self.students[0]
+        messages = student.message_ids
+
+        with patch.object(type(template), 'send_mail', side_effect=ValueError("broken")):
+            student._send_pending_reports(template)
+            self.assertEqual(student.report_attempt_count, 1)
+            self.assertTrue(student.report_next_attempt)
+            self.assertNotIn(student, Student._claim_pending_reports(100), "Not due before its backoff")
+
+            student.write({'report_next_attempt': '2000-01-01 00:00:00'})
+            student._send_pending_reports(template)
+
+        self.assertTrue(student.report_failed)
+        self.assertTrue(student.report_pending)
+        self.assertEqual(len(student.message_ids - messages), 1)
+        self.assertNotIn(student, Student._claim_pending_reports(100), "Dead letters are never claimed")
+
+        student.action_retry_report()
+        self.assertFalse(student.report_failed)
+        self.assertEqual(student.report_attempt_count, 0)
+        self.assertIn(student, Student._claim_pending_reports(100))
+
+    def test_database_error_recorded_as_failure(self):
+        """A send aborting its statement is rolled back alone; its failure is still recorded."""
+        template = self.env.ref('university.email_template_student_report')
+        failing, sent = self.students[:2]
+
+        def send_mail(template_self, res_id, **kwargs):
+            if res_id == failing.id:
+                self.env.cr.execute("SELECT 1 / 0")
+            return send_mail_origin(template_self, res_id, **kwargs)
+
+        send_mail_origin = type(template).send_mail
+        with patch.object(type(template), 'send_mail', send_mail), mute_logger('odoo.sql_db'):
+            (failing | sent)._send_pending_reports(template)
+
+        self.assertEqual(failing.report_attempt_count, 1)
+        self.assertIn('division by zero', failing.report_error)
+        self.assertFalse(sent.report_pending)
+
+    def test_one_outline_heading_per_student(self):
+        """Batched PDFs are split along one top-level heading per student."""
+        students = self.students[:3]
+        html, _report_type = self.env['ir.actions.report']._render_qweb_html(
+            'university.action_report_student', students.ids,
+        )
+        self.assertEqual(html.count(b'<h1'), len(students))
+        self.assertFalse(any(html.count(tag) for tag in (b'<h2', b'<h3', b'<h4', b'<h5', b'<h6')))
+
+    def test_prerendered_pdfs_are_attached(self):
+        """Reports rendered ahead by the batch path are served instead of being rendered again."""
+        student = self.students[0]
+        pdf = b'%PDF-1.4 prerendered'
+        content, content_type = self.env['ir.actions.report'].with_context(
+            force_report_rendering=True,
+            university_report_pdfs={student.id: pdf},
+        )._render_qweb_pdf('university.action_report_student', student.ids)
+
+        self.assertEqual((content, content_type), (pdf, 'pdf'))
+
+    def test_report_pdf_cache(self):
+        """Rendered PDFs are reused until the student's report data changes."""
+        student = self.students[0]
+        Report = self.env['ir.actions.report'].with_context(force_report_rendering=True)
+        pdf = b'%PDF-1.4 cached'
+        Report.with_context(university_report_pdfs={student.id: pdf})._render_qweb_pdf(
+            'university.action_report_student', student.ids,
+        )
+        self.assertEqual(student.sudo().report_pdf_fingerprint, student._get_report_fingerprints()[student.id])
+
+        # Served from the cache: no rendering happens
+        content, _content_type = Report._render_qweb_pdf('university.action_report_student', student.ids)
+        self.assertEqual(content, pdf)
+
+        fingerprint = student._get_report_fingerprints()[student.id]
+        student.city = 'Elsewhere'
+        self.assertNotEqual(student._get_report_fingerprints()[student.id], fingerprint)
+        self.assertFalse(student._get_cached_report_pdfs(student._get_report_fingerprints()))
+
+        department = self.env['university.department'].create({
+            'name': 'Mail Dept',
+            'university_id': self.university.id,
+        })
+        subject = self.env['university.subject'].create({
+            'name': 'Mail Subject',
+            'code': 'MAIL101',
+            'department_id': department.id,
+        })
+        self.env['university.enrollment'].create({
+            'student_id': student.id,
+            'subject_id': subject.id,
+            'university_id': self.university.id,
+        })
+        self.assertFalse(student.sudo().report_pdf_fingerprint, "A new enrollment drops the cached PDF")
+
+    def test_quick_report_queued_and_notified(self):
+        """Quick reports return at once, go first in the queue and notify their requester."""
+        student = self.env['university.student'].create({
+            'name': 'Quick Student',
+            'email': 'quick_student@example.com',
+            'university_id': self.university.id,
+        })
+        self.assertEqual(student.action_send_email_silent_js(), student.email)
+        self.assertTrue(student.report_pending)
+        self.assertEqual(student.report_requested_by, self.env.user)
+
+        claimed = self.env['university.student']._claim_pending_reports(1)
+        self.assertEqual(claimed, student, "Quick reports jump the bulk backlog")
+
+        Users = type(self.env['res.users'])
+        with patch.object(Users, '_bus_send', autospec=True) as bus_send:
+            claimed._send_pending_reports(self.env.ref('university.email_template_student_report'))
+
+        self.assertFalse(student.report_pending)
+        self.assertFalse(student.report_requested_by)
+        bus_send.assert_called_once()
+        _user, notification_type, payload = bus_send.call_args.args
+        self.assertEqual((notification_type, payload['type']), ('simple_notification', 'success'))
+
+    def test_report_changed_students(self):
+        """Only students whose record differs from their last report are flagged again."""
+        department = self.env['university.department'].create({
+            'name': 'Changed Dept',
+            'university_id': self.university.id,
+        })
+        subject = self.env['university.subject'].create({
+            'name': 'Changed Subject',
+            'code': 'CHG101',
+            'department_id': department.id,
+        })
+        changed, reverted = self.students[:2]
+        grades = self.env['university.grade'].create([{
+            'enrollment_id': self.env['university.enrollment'].create({
+                'student_id': student.id,
+                'subject_id': subject.id,
+                'university_id': self.university.id,
+            }).id,
+            'score': 5.0,
+        } for student in (changed, reverted)])
+        self.students.write({'report_pending': False})
+        (changed | reverted)._record_sent_fingerprints()
+        self.assertFalse((changed | reverted).filtered('report_dirty'))
+
+        grades[0].score = 7.0
+        grades[1].score = 9.0
+        grades[1].score = 5.0
+        self.assertEqual((changed | reverted).filtered('report_dirty'), changed | reverted)
+
+        self.env['university.student'].action_report_changed_students()
+        self.assertTrue(changed.report_pending)
+        self.assertFalse(reverted.report_pending)
+        self.assertFalse(reverted.report_dirty)
@@ -0,0 +1,93 @@
+import os
+import zipfile
+
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('university')
+class TestTranscriptExport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.university = cls.env['university.university'].create({'name': 'Export Uni'})
+        cls.other_university = cls.env['university.university'].create({'name': 'Export Other Uni'})
+        cls.department = cls.env['university.department'].create({
+            'name': 'Export Dept',
+            'university_id': cls.university.id,
+        })
+        cls.subject = cls.env['university.subject'].create({
+            'name': 'Export Subject',
+            'code': 'EXP101',
+            'department_id': cls.department.id,
+        })
+        cls.students = cls.env['university.student'].create([{
+            'name': f'Export Student {i}',
+            'email': f'export_student_{i}@example.com',
+            'university_id': cls.university.id,
+        } for i in range(3)])
+        cls.env['university.student'].create({
+            'name': 'Export Foreign Student',
+            'email': 'export_foreign@example.com',
+            'university_id': cls.other_university.id,
+        })
+        cls.env['university.enrollment'].create({
+            'student_id': cls.students[0].id,
+            'subject_id': cls.subject.id,
+            'university_id': cls.university.id,
+        })
+
+    def _run_export(self, **vals):
+        export = self.env['university.transcript.export'].create({'university_id': self.university.id, **vals})
+        self.addCleanup(export.unlink)
+        export.action_start()
+        self.env['university.transcript.export']._cron_process_exports()
+        return export
+
+    def test_export_university_to_zip(self):
+        """Every student of the university gets one transcript in the ZIP file."""
+        export = self._run_export()
+
+        self.assertEqual(export.state, 'done')
+        self.assertEqual((export.processed_count, export.student_count), (3, 3))
+        self.assertEqual(export.progress, 100.0)
+        with zipfile.ZipFile(export._get_file_path()) as archive:
+            names = archive.namelist()
+        self.assertEqual(len(names), 3)
+        self.assertTrue(all(str(student.id) in name for student, name in zip(self.students, sorted(names))))
+
+    def test_export_subject_scope(self):
+        """A subject export only contains the students enrolled in it."""
+        export = self._run_export(scope='subject', subject_id=self.subject.id)
+
+        self.assertEqual(export.state, 'done')
+        with zipfile.ZipFile(export._get_file_path()) as archive:
+            self.assertEqual(len(archive.namelist()), 1)
+
+    def test_replayed_chunk_after_crash(self):
+        """A chunk replayed after a crash rewrites its part; a half-written part is ignored."""
+        export = self._run_export()
+        export.write({'state': 'running', 'processed_count': 0, 'last_student_id': 0})
+        parts_directory = export._get_parts_directory()
+        os.makedirs(parts_directory, exist_ok=True)
+        with open(os.path.join(parts_directory, f'{0:012d}.zip.tmp'), 'wb') as stray:
+            stray.write(b'PK half written')
+        self.env['university.transcript.export']._cron_process_exports()
+
+        self.assertEqual(export.state, 'done')
+        with zipfile.ZipFile(export._get_file_path()) as archive:
+            self.assertEqual(len(archive.namelist()), 3)
+        self.assertFalse(os.path.exists(parts_directory))
+
+    def test_exports_restricted_to_requester(self):
+        """Employees only see their own exports."""
+        export = self.env['university.transcript.export'].create({'university_id': self.university.id})
+        employee = self.env['res.users'].create({
+            'name': 'Export Employee',
+            'login': 'export_employee',
+            'group_ids': [(6, 0, [self.env.ref('base.group_user').id])],
+        })
+        Export = self.env['university.transcript.export'].with_user(employee)
+        self.assertNotIn(export, Export.search([]))
+        own = Export.create({'university_id': self.university.id})
+        self.assertEqual(Export.search([('id', 'in', (export | own).ids)]), own)